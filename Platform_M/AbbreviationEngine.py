@@ -0,0 +1,49 @@
+from __future__ import absolute_import, print_function, unicode_literals
+from builtins import range
+from builtins import object
+from .consts import *
+from .LruCache import LruCache
+
+class AbbreviationEngine(object):
+    """
+        Shortens track names, parameter names and values to the 6 characters of a
+        channel strip display cell. The same few names are shown over and over again,
+        so every abbreviation is only computed once and then taken from an LRU cache.
+    """
+
+    def __init__(self, cache_size = ABBREVIATION_CACHE_SIZE):
+        self.__cache = LruCache(cache_size)
+
+    def abbreviate(self, display_string):
+        if not display_string:
+            return u'      '
+        return self.__cache.get(display_string, self.__generate_6_char_string)
+
+    def hits(self):
+        return self.__cache.hits()
+
+    def misses(self):
+        return self.__cache.misses()
+
+    def __generate_6_char_string(self, display_string):
+        if len(display_string.strip()) > 6 and display_string.endswith(u'dB') and display_string.find(u'.') != -1:
+            display_string = display_string[:-2]
+        if len(display_string) > 6:
+            for um in [u' ',
+             u'i',
+             u'o',
+             u'u',
+             u'e',
+             u'a']:
+                while len(display_string) > 6 and display_string.rfind(um, 1) != -1:
+                    um_pos = display_string.rfind(um, 1)
+                    display_string = display_string[:um_pos] + display_string[um_pos + 1:]
+
+        else:
+            display_string = display_string.center(6)
+        ret = u''
+        for i in range(6):
+            ret += display_string[i]
+
+        assert len(ret) == 6
+        return ret
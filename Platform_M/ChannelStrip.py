@@ -1,9 +1,6 @@
 #Embedded file name: /Users/versonator/Jenkins/live/output/Live/mac_64_static/Release/python-bundle/MIDI Remote Scripts/MackieControl/ChannelStrip.py
 from __future__ import absolute_import, print_function, unicode_literals
-from builtins import range
 from .MackieControlComponent import *
-from itertools import chain
-from ableton.v2.base import liveobj_valid
 
 class ChannelStrip(MackieControlComponent):
     """ Represents a Channel Strip of the Mackie Control """
@@ -19,12 +16,20 @@ class ChannelStrip(MackieControlComponent):
         self.__v_pot_parameter = None
         self.__v_pot_display_mode = VPOT_DISPLAY_SINGLE_DOT
         self.__fader_parameter = None
+        self.__fader_feedback = None
+        self.__v_pot_feedback = None
         self.__meters_enabled = False
-        self.__last_meter_value = -1
         self.__send_meter_mode()
         self.__within_track_added_or_deleted = False
         self.__within_destroy = False
         self.__master_mode = True
+        """ Indexed by the CSF_* function of a channel strip switch """
+        self.__switch_handlers = (self.__on_record_arm_switch,
+         self.__on_solo_switch,
+         self.__on_mute_switch,
+         self.__on_select_switch,
+         self.__on_vpot_push_switch,
+         self.__on_fader_touch_switch)
         self.set_bank_and_channel_offset(offset=0, show_return_tracks=False, within_track_added_or_deleted=False)
 
     def destroy(self):
@@ -68,9 +73,9 @@ class ChannelStrip(MackieControlComponent):
         final_track_index = self.__strip_index + self.__stack_offset + offset
         self.__within_track_added_or_deleted = within_track_added_or_deleted
         if show_return_tracks:
-            tracks = self.song().return_tracks
+            tracks = self.live_snapshot().return_tracks()
         else:
-            tracks = self.song().visible_tracks
+            tracks = self.live_snapshot().visible_tracks()
         if final_track_index < len(tracks):
             new_track = tracks[final_track_index]
         else:
@@ -81,7 +86,10 @@ class ChannelStrip(MackieControlComponent):
             self.__assigned_track = new_track
             if self.__assigned_track:
                 self.__add_listeners()
-        self.refresh_state()
+            self.refresh_state()
+        elif not within_track_added_or_deleted:
+            """ When tracks were added or deleted, strips that keep their track have nothing to refresh """
+            self.refresh_state()
         self.__within_track_added_or_deleted = False
 
     def v_pot_parameter(self):
@@ -107,50 +115,62 @@ class ChannelStrip(MackieControlComponent):
             self.__send_meter_mode()
 
     def reset_fader(self):
+        self.__fader_feedback = None
         self.send_midi((PB_STATUS + self.__strip_index, 0, 0))
 
     def unlight_vpot_leds(self):
+        self.__v_pot_feedback = None
         self.send_midi((CC_STATUS + 0, 48 + self.__strip_index, 32))
 
     def show_full_enlighted_poti(self):
+        self.__v_pot_feedback = None
         self.send_midi((CC_STATUS + 0, 48 + self.__strip_index, VPOT_DISPLAY_WRAP * 16 + 11))
 
+    def invalidate_parameter_feedback(self):
+        """ Called from the main script when the fader and V-Pot ring positions are unknown """
+        self.__fader_feedback = None
+        self.__v_pot_feedback = None
+
     def handle_channel_strip_switch_ids(self, sw_id, value):
-        if sw_id in range(SID_RECORD_ARM_BASE, SID_RECORD_ARM_BASE + NUM_CHANNEL_STRIPS):
-            if sw_id - SID_RECORD_ARM_BASE is self.__strip_index:
-                if value == BUTTON_PRESSED:
-                    if self.song().exclusive_arm:
-                        exclusive = not self.master_is_pressed() #Before: control
-                    else:
-                        exclusive = self.master_is_pressed() #Before: control
-                    self.__toggle_arm_track(exclusive)
-        elif sw_id in range(SID_SOLO_BASE, SID_SOLO_BASE + NUM_CHANNEL_STRIPS):
-            if sw_id - SID_SOLO_BASE is self.__strip_index:
-                if value == BUTTON_PRESSED:
-                    if self.song().exclusive_solo:
-                        exclusive = not self.master_is_pressed() #Before: control
-                    else:
-                        exclusive = self.master_is_pressed() #Before: control
-                    self.__toggle_solo_track(exclusive)
-        elif sw_id in range(SID_MUTE_BASE, SID_MUTE_BASE + NUM_CHANNEL_STRIPS):
-            if sw_id - SID_MUTE_BASE is self.__strip_index:
-                if value == BUTTON_PRESSED:
-                    self.__toggle_mute_track()
-        elif sw_id in range(SID_SELECT_BASE, SID_SELECT_BASE + NUM_CHANNEL_STRIPS):
-            if sw_id - SID_SELECT_BASE is self.__strip_index:
-                if value == BUTTON_PRESSED:
-                    self.__select_track()
-        elif sw_id in range(SID_VPOD_PUSH_BASE, SID_VPOD_PUSH_BASE + NUM_CHANNEL_STRIPS):
-            if sw_id - SID_VPOD_PUSH_BASE is self.__strip_index:
-                if value == BUTTON_PRESSED and self.__channel_strip_controller != None:
-                    self.__channel_strip_controller.handle_pressed_v_pot(self.__strip_index, self.__stack_offset)
-        elif sw_id in fader_touch_switch_ids:
-            if sw_id - SID_FADER_TOUCH_SENSE_BASE is self.__strip_index:
-                if value == BUTTON_PRESSED or value == BUTTON_RELEASED:
-                    if self.__channel_strip_controller != None:
-                        touched = value == BUTTON_PRESSED
-                        self.set_is_touched(touched)
-                        self.__channel_strip_controller.handle_fader_touch(self.__strip_index, self.__stack_offset, touched)
+        """ Decodes the switch once and only handles it if it belongs to this strip """
+        address = channel_strip_switch_address.get(sw_id)
+        if address and address[1] == self.__strip_index:
+            self.__switch_handlers[address[0]](value)
+
+    def __on_record_arm_switch(self, value):
+        if value == BUTTON_PRESSED:
+            if self.song().exclusive_arm:
+                exclusive = not self.master_is_pressed() #Before: control
+            else:
+                exclusive = self.master_is_pressed() #Before: control
+            self.__toggle_arm_track(exclusive)
+
+    def __on_solo_switch(self, value):
+        if value == BUTTON_PRESSED:
+            if self.song().exclusive_solo:
+                exclusive = not self.master_is_pressed() #Before: control
+            else:
+                exclusive = self.master_is_pressed() #Before: control
+            self.__toggle_solo_track(exclusive)
+
+    def __on_mute_switch(self, value):
+        if value == BUTTON_PRESSED:
+            self.__toggle_mute_track()
+
+    def __on_select_switch(self, value):
+        if value == BUTTON_PRESSED:
+            self.__select_track()
+
+    def __on_vpot_push_switch(self, value):
+        if value == BUTTON_PRESSED and self.__channel_strip_controller != None:
+            self.__channel_strip_controller.handle_pressed_v_pot(self.__strip_index, self.__stack_offset)
+
+    def __on_fader_touch_switch(self, value):
+        if value == BUTTON_PRESSED or value == BUTTON_RELEASED:
+            if self.__channel_strip_controller != None:
+                touched = value == BUTTON_PRESSED
+                self.set_is_touched(touched)
+                self.__channel_strip_controller.handle_fader_touch(self.__strip_index, self.__stack_offset, touched)
 
     def handle_vpot_rotation(self, strip_index, cc_value):
         if strip_index is self.__strip_index and self.__channel_strip_controller != None:
@@ -158,32 +178,26 @@ class ChannelStrip(MackieControlComponent):
 
     def refresh_state(self):
         if not self.__within_track_added_or_deleted:
-            self.__update_track_is_selected_led()
+            self.update_track_is_selected_led()
         self.__update_solo_led()
         self.__update_mute_led()
         self.__update_arm_led()
         if not self.__within_destroy and self.__assigned_track != None:
             self.__send_meter_mode()
-            self.__last_meter_value = -1
+            self.meter_engine().invalidate(self.__strip_index)
         if not self.__assigned_track:
             self.reset_fader()
             self.unlight_vpot_leds()
 
-    def on_update_display_timer(self):
-        if not self.main_script().is_pro_version or self.__meters_enabled and self.__channel_strip_controller.assignment_mode() == CSM_VOLPAN:
-            if self.__assigned_track:
-                if self.__assigned_track.can_be_armed and self.__assigned_track.arm:
-                    meter_value = self.__assigned_track.input_meter_level
-                else:
-                    meter_value = self.__assigned_track.output_meter_level
-            else:
-                meter_value = 0.0
-            meter_byte = int(meter_value * 12.0) + (self.__strip_index << 4)
-            if self.__last_meter_value != meter_value or meter_value != 0.0:
-                self.__last_meter_value = meter_value
-                self.send_midi((208, meter_byte))
+    def shows_meter(self):
+        return not self.main_script().is_pro_version or self.__meters_enabled and self.__channel_strip_controller.assignment_mode() == CSM_VOLPAN
 
     def build_midi_map(self, midi_map_handle):
+        """
+            The mappings have to be set up with every rebuild, but the feedback of a parameter
+            is only sent if the fader or V-Pot ring doesn't show it already, as a feedback
+            burst after each rebuild lets all the motor faders twitch
+        """
         needs_takeover = False
         if self.__fader_parameter:
             feeback_rule = Live.MidiMap.PitchBendFeedbackRule()
@@ -191,56 +205,47 @@ class ChannelStrip(MackieControlComponent):
             feeback_rule.value_pair_map = tuple()
             feeback_rule.delay_in_ms = 200.0
             Live.MidiMap.map_midi_pitchbend_with_feedback_map(midi_map_handle, self.__fader_parameter, self.__strip_index, feeback_rule, not needs_takeover)
-            Live.MidiMap.send_feedback_for_parameter(midi_map_handle, self.__fader_parameter)
+            if self.__fader_feedback != self.__fader_parameter:
+                Live.MidiMap.send_feedback_for_parameter(midi_map_handle, self.__fader_parameter)
+                self.__fader_feedback = self.__fader_parameter
         else:
             channel = self.__strip_index
             Live.MidiMap.forward_midi_pitchbend(self.script_handle(), midi_map_handle, channel)
         if self.__v_pot_parameter:
-            if self.__v_pot_display_mode == VPOT_DISPLAY_SPREAD:
-                range_end = 7
-            else:
-                range_end = 12
             feeback_rule = Live.MidiMap.CCFeedbackRule()
             feeback_rule.channel = 0
             feeback_rule.cc_no = 48 + self.__strip_index
-            feeback_rule.cc_value_map = tuple([ self.__v_pot_display_mode * 16 + x for x in range(1, range_end) ])
+            feeback_rule.cc_value_map = vpot_ring_cc_value_maps[self.__v_pot_display_mode]
             feeback_rule.delay_in_ms = -1.0
             Live.MidiMap.map_midi_cc_with_feedback_map(midi_map_handle, self.__v_pot_parameter, 0, FID_PANNING_BASE + self.__strip_index, Live.MidiMap.MapMode.relative_signed_bit, feeback_rule, needs_takeover)
-            Live.MidiMap.send_feedback_for_parameter(midi_map_handle, self.__v_pot_parameter)
+            v_pot_feedback = (self.__v_pot_parameter, self.__v_pot_display_mode)
+            if self.__v_pot_feedback != v_pot_feedback:
+                Live.MidiMap.send_feedback_for_parameter(midi_map_handle, self.__v_pot_parameter)
+                self.__v_pot_feedback = v_pot_feedback
         else:
             channel = 0
             cc_no = FID_PANNING_BASE + self.__strip_index
             Live.MidiMap.forward_midi_cc(self.script_handle(), midi_map_handle, channel, cc_no)
 
     def __assigned_track_index(self):
-        index = 0
-        for t in chain(self.song().visible_tracks, self.song().return_tracks):
-            if t == self.__assigned_track:
-                return index
-            index += 1
-
+        index = self.track_index().visible_track_position(self.__assigned_track)
         if self.__assigned_track:
-            assert 0
+            assert index != None
+        return index
 
     def __add_listeners(self):
+        subscriptions = self.track_subscriptions()
         if self.__assigned_track.can_be_armed:
-            self.__assigned_track.add_arm_listener(self.__update_arm_led)
-        self.__assigned_track.add_mute_listener(self.__update_mute_led)
-        self.__assigned_track.add_solo_listener(self.__update_solo_led)
-        if not self.song().view.selected_track_has_listener(self.__update_track_is_selected_led):
-            self.song().view.add_selected_track_listener(self.__update_track_is_selected_led)
+            subscriptions.add_listener(self.__assigned_track, u'arm', self.__update_arm_led)
+        subscriptions.add_listener(self.__assigned_track, u'mute', self.__update_mute_led)
+        subscriptions.add_listener(self.__assigned_track, u'solo', self.__update_solo_led)
 
     def __remove_listeners(self):
-        if liveobj_valid(self.__assigned_track):
-            if self.__assigned_track.can_be_armed:
-                self.__remove_listener(self.__assigned_track, u'arm', self.__update_arm_led)
-            self.__remove_listener(self.__assigned_track, u'mute', self.__update_mute_led)
-            self.__remove_listener(self.__assigned_track, u'solo', self.__update_solo_led)
-            self.__remove_listener(self.song().view, u'selected_track', self.__update_track_is_selected_led)
-
-    def __remove_listener(self, object, property, listener):
-        if getattr(object, u'{}_has_listener'.format(property))(listener):
-            getattr(object, u'remove_{}_listener'.format(property))(listener)
+        """ Unsubscribing a track we never subscribed to (e.g. arm) is a no-op """
+        subscriptions = self.track_subscriptions()
+        subscriptions.remove_listener(self.__assigned_track, u'arm', self.__update_arm_led)
+        subscriptions.remove_listener(self.__assigned_track, u'mute', self.__update_mute_led)
+        subscriptions.remove_listener(self.__assigned_track, u'solo', self.__update_solo_led)
 
     def __send_meter_mode(self):
         on_mode = 1
@@ -269,7 +274,7 @@ class ChannelStrip(MackieControlComponent):
         if self.__assigned_track and self.__assigned_track.can_be_armed:
             self.__assigned_track.arm = not self.__assigned_track.arm
             if exclusive:
-                for t in self.song().tracks:
+                for t in self.track_index().armed_tracks():
                     if t != self.__assigned_track:
                         t.arm = False
 
@@ -281,15 +286,16 @@ class ChannelStrip(MackieControlComponent):
         if self.__assigned_track:
             self.__assigned_track.solo = not self.__assigned_track.solo
             if exclusive:
-                for t in chain(self.song().tracks, self.song().return_tracks):
+                for t in self.track_index().soloed_tracks():
                     if t != self.__assigned_track:
                         t.solo = False
 
     def __select_track(self):
         if self.__assigned_track:
-            all_tracks = tuple(self.song().visible_tracks) + tuple(self.song().return_tracks)
-            if self.song().view.selected_track != all_tracks[self.__assigned_track_index()]:
-                self.song().view.selected_track = all_tracks[self.__assigned_track_index()]
+            all_tracks = self.track_index().visible_tracks()
+            assigned_track_index = self.__assigned_track_index()
+            if self.live_snapshot().selected_track() != all_tracks[assigned_track_index]:
+                self.song().view.selected_track = all_tracks[assigned_track_index]
             elif self.application().view.is_view_visible(u'Arranger'):
                 if self.__assigned_track:
                     self.__assigned_track.view.is_collapsed = not self.__assigned_track.view.is_collapsed
@@ -297,13 +303,11 @@ class ChannelStrip(MackieControlComponent):
     def __update_arm_led(self):
         track = self.__assigned_track
         if track and track.can_be_armed and track.arm:
-            self.send_midi((NOTE_ON_STATUS, SID_RECORD_ARM_BASE + self.__strip_index, BUTTON_STATE_ON))
             """ Firmware Bug in Platform M+, only recognized if send two times """
-            self.send_midi((NOTE_ON_STATUS, SID_RECORD_ARM_BASE + self.__strip_index, BUTTON_STATE_ON))
+            self.send_midi((NOTE_ON_STATUS, SID_RECORD_ARM_BASE + self.__strip_index, BUTTON_STATE_ON), repeat=2)
         else:
-            self.send_midi((NOTE_ON_STATUS, SID_RECORD_ARM_BASE + self.__strip_index, BUTTON_STATE_OFF))
             """ Firmware Bug in Platform M+,  only recognized if send two times """
-            self.send_midi((NOTE_ON_STATUS, SID_RECORD_ARM_BASE + self.__strip_index, BUTTON_STATE_OFF))
+            self.send_midi((NOTE_ON_STATUS, SID_RECORD_ARM_BASE + self.__strip_index, BUTTON_STATE_OFF), repeat=2)
 
     def __update_mute_led(self):
         if self.__assigned_track and self.__assigned_track.mute:
@@ -317,7 +321,8 @@ class ChannelStrip(MackieControlComponent):
         else:
             self.send_midi((NOTE_ON_STATUS, SID_SOLO_BASE + self.__strip_index, BUTTON_STATE_OFF))
 
-    def __update_track_is_selected_led(self):
+    def update_track_is_selected_led(self):
+        """ Called from the 'ChannelStripController' when the selection moved to or away from our track """
         if self.song().view.selected_track == self.__assigned_track:
             self.send_midi((NOTE_ON_STATUS, SID_SELECT_BASE + self.__strip_index, BUTTON_STATE_ON))
         else:
@@ -331,6 +336,7 @@ class MasterChannelStrip(MackieControlComponent):
         self.__strip_index = MASTER_CHANNEL_STRIP_INDEX
         self.__assigned_track = self.song().master_track
         self.__master_volume = True
+        self.__fader_feedback = None
 
     def destroy(self):
         self.reset_fader()
@@ -345,15 +351,16 @@ class MasterChannelStrip(MackieControlComponent):
     def refresh_state(self):
         pass
 
-    def on_update_display_timer(self):
-        pass
-
     def enable_meter_mode(self, Enabled):
         pass
 
     def reset_fader(self):
+        self.__fader_feedback = None
         self.send_midi((PB_STATUS + self.__strip_index, 0, 0))
 
+    def invalidate_parameter_feedback(self):
+        self.__fader_feedback = None
+
     def master_volume_status(self):
         if self.__master_volume:
             status2 = u'Master Volume'
@@ -381,4 +388,6 @@ class MasterChannelStrip(MackieControlComponent):
             feeback_rule.value_pair_map = tuple()
             feeback_rule.delay_in_ms = 200.0
             Live.MidiMap.map_midi_pitchbend_with_feedback_map(midi_map_handle, volume, self.__strip_index, feeback_rule, not needs_takeover)
-            Live.MidiMap.send_feedback_for_parameter(midi_map_handle, volume)
+            if self.__fader_feedback != volume:
+                Live.MidiMap.send_feedback_for_parameter(midi_map_handle, volume)
+                self.__fader_feedback = volume
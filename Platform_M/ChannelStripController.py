@@ -5,32 +5,16 @@ from builtins import chr
 from builtins import range
 from past.utils import old_div
 from .MackieControlComponent import *
+from .DeviceParameterIndex import DeviceParameterIndex
+from .RoutingTargetCache import RoutingTargetCache, available_routing_targets_properties
 from _Generic.Devices import *
-from itertools import chain
+from ableton.v2.base import liveobj_valid
 flatten_target = lambda routing_target: routing_target.display_name
-
-def flatten_target_list(target_list):
-    """
-        Takes a list of RoutingType- or RoutingChannel objects
-        and returns a list of their 'display_names'
-    """
-    target_names = []
-    for target in target_list:
-        name = flatten_target(target)
-        if name not in target_names:
-            target_names.append(name)
-
-    return target_names
-
-
-def target_by_name(target_list, name):
-    """
-        Return the first object in 'target_list' whose 'display_name' is equal to 'name'
-    """
-    matches = [ t for t in target_list if t.display_name == name ]
-    if matches:
-        return matches[0]
-
+""" The track property that holds the routing shown in the display, per IO sub mode """
+routing_target_properties = {CSM_IO_MODE_INPUT_MAIN: u'input_routing_type',
+ CSM_IO_MODE_INPUT_SUB: u'input_routing_channel',
+ CSM_IO_MODE_OUTPUT_MAIN: u'output_routing_type',
+ CSM_IO_MODE_OUTPUT_SUB: u'output_routing_channel'}
 
 class ChannelStripController(MackieControlComponent):
     """
@@ -84,7 +68,12 @@ class ChannelStripController(MackieControlComponent):
         self.__plugin_mode_offsets = [ 0 for x in range(PCM_NUMMODES) ]
         self.__chosen_plugin = None
         self.__ordered_plugin_parameters = []
+        self.__device_parameter_index = DeviceParameterIndex()
+        self.__routing_targets = RoutingTargetCache()
+        self.__routing_subscriptions = []
+        self.__io_strip_strings = None
         self.__displayed_plugins = []
+        self.__plugin_name_strings = None
         self.__last_attached_selected_track = None
         self.__send_mode_offset = 0
         self.__flip = False
@@ -93,14 +82,13 @@ class ChannelStripController(MackieControlComponent):
         self.__bank_cha_offset_returns = 0
         self.__within_track_added_or_deleted = False
         self.__page_switch = u''
+        self.__audio_output_tracks = {}
+        self.__touched_strips = set()
+        self.__display_parameter_pairs = []
         self.song().add_visible_tracks_listener(self.__on_tracks_added_or_deleted)
         self.song().view.add_selected_track_listener(self.__on_selected_track_changed)
-        for t in chain(self.song().visible_tracks, self.song().return_tracks):
-            if not t.solo_has_listener(self.__update_rude_solo_led):
-                t.add_solo_listener(self.__update_rude_solo_led)
-            if not t.has_audio_output_has_listener(self.__on_any_tracks_output_type_changed):
-                t.add_has_audio_output_listener(self.__on_any_tracks_output_type_changed)
-
+        self.track_index().add_any_soloed_listener(self.__update_rude_solo_led)
+        self.__update_audio_output_listeners()
         self.__on_selected_track_changed()
         for s in self.__own_channel_strips:
             s.set_channel_strip_controller(self)
@@ -108,16 +96,25 @@ class ChannelStripController(MackieControlComponent):
         self.__reassign_channel_strip_offsets()
         self.__reassign_channel_strip_parameters(for_display_only=False)
         self._last_assignment_mode = self.__assignment_mode
+        self.add_tick_job(u'channel strip strings', self.on_update_display_timer, is_active=self.__shows_channel_strip_strings)
 
     def destroy(self):
         self.song().remove_visible_tracks_listener(self.__on_tracks_added_or_deleted)
         self.song().view.remove_selected_track_listener(self.__on_selected_track_changed)
-        for t in chain(self.song().visible_tracks, self.song().return_tracks):
-            if t.solo_has_listener(self.__update_rude_solo_led):
-                t.remove_solo_listener(self.__update_rude_solo_led)
-            if t.has_audio_output_has_listener(self.__on_any_tracks_output_type_changed):
+        if self.track_index().any_soloed_has_listener(self.__update_rude_solo_led):
+            self.track_index().remove_any_soloed_listener(self.__update_rude_solo_led)
+        for t in self.__audio_output_tracks.values():
+            if liveobj_valid(t) and t.has_audio_output_has_listener(self.__on_any_tracks_output_type_changed):
                 t.remove_has_audio_output_listener(self.__on_any_tracks_output_type_changed)
 
+        self.__audio_output_tracks = {}
+        self.__routing_targets.clear()
+        self.__release_routing_listeners()
+        for plugin in self.__displayed_plugins:
+            if liveobj_valid(plugin) and plugin.name_has_listener(self.__update_plugin_names):
+                plugin.remove_name_listener(self.__update_plugin_names)
+
+        self.__displayed_plugins = []
         st = self.__last_attached_selected_track
         if st and st.devices_has_listener(self.__on_selected_device_chain_changed):
             st.remove_devices_listener(self.__on_selected_device_chain_changed)
@@ -175,11 +172,15 @@ class ChannelStripController(MackieControlComponent):
         """ Overridden to call also the extensions request_rebuild_midi_map """
         MackieControlComponent.request_rebuild_midi_map(self)
         for ex in self.__left_extensions + self.__right_extensions:
-            ex.request_rebuild_midi_map()
+            self.main_script().request_rebuild_midi_map(ex)
 
     def on_update_display_timer(self):
         self.__update_channel_strip_strings()
 
+    def __shows_channel_strip_strings(self):
+        """ Only IO mode and choosing a plug-in show strings instead of parameters """
+        return self.__assignment_mode == CSM_IO or self.__assignment_mode == CSM_PLUGINS and self.__plugin_mode == PCM_DEVICES
+
     def toggle_meter_mode(self):
         """ Called from the main script when the display toggle button was pressed """
         self.__meters_enabled = not self.__meters_enabled
@@ -252,8 +253,8 @@ class ChannelStripController(MackieControlComponent):
             current_routing = self.__routing_target(channel_strip)
             available_routings = self.__available_routing_targets(channel_strip)
             if current_routing and available_routings:
-                if current_routing in available_routings:
-                    i = list(available_routings).index(current_routing)
+                i = self.__routing_targets.index_of(channel_strip.assigned_track(), self.__sub_mode_in_io_mode, current_routing)
+                if i != None:
                     if direction == 1:
                         new_i = min(len(available_routings) - 1, i + direction)
                     else:
@@ -269,8 +270,18 @@ class ChannelStripController(MackieControlComponent):
             assert not channel_strip.assigned_track() or not channel_strip.assigned_track().has_audio_output, u'in every other mode, the midimap should handle the messages'
 
     def handle_fader_touch(self, strip_offset, stack_offset, touched):
-        """ Forwarded to us by the channel_strips """
-        self.__reassign_channel_strip_parameters(for_display_only=True)
+        """
+            Forwarded to us by the channel_strips (also the ones of the extensions).
+            While any fader is touched, the display shows the fader instead of the V-Pot
+            parameters, so only when that flips, the display parameters need to be swapped.
+        """
+        any_fader_was_touched = self.__any_fader_is_touched()
+        if touched:
+            self.__touched_strips.add(stack_offset + strip_offset)
+        else:
+            self.__touched_strips.discard(stack_offset + strip_offset)
+        if self.__any_fader_is_touched() != any_fader_was_touched:
+            self.__update_display_parameters()
 
     def handle_pressed_v_pot(self, strip_index, stack_offset):
         """ Forwarded to us by the channel_strips """
@@ -287,11 +298,13 @@ class ChannelStripController(MackieControlComponent):
                     param.value = param.default_value
         elif self.__assignment_mode == CSM_PLUGINS and self.__plugin_mode == PCM_DEVICES:
             device_index = strip_index + stack_offset + self.__plugin_mode_offsets[PCM_DEVICES]
-            if device_index >= 0 and device_index < len(self.song().view.selected_track.devices):
+            if device_index >= 0 and device_index < len(self.live_snapshot().selected_track().devices):
                 if self.__chosen_plugin != None:
                     self.__chosen_plugin.remove_parameters_listener(self.__on_parameter_list_of_chosen_plugin_changed)
-                self.__chosen_plugin = self.song().view.selected_track.devices[device_index]
+                self.__chosen_plugin = self.live_snapshot().selected_track().devices[device_index]
                 if self.__chosen_plugin != None:
+                    """ We did not follow its parameter list while it was not chosen """
+                    self.__device_parameter_index.invalidate(self.__chosen_plugin)
                     self.__chosen_plugin.add_parameters_listener(self.__on_parameter_list_of_chosen_plugin_changed)
                 self.__reorder_parameters()
                 self.__plugin_mode_offsets[PCM_PARAMETERS] = 0
@@ -344,16 +357,17 @@ class ChannelStripController(MackieControlComponent):
     def __controlled_num_of_tracks(self):
         """ Return the number of tracks, depending on if we are in send_track mode or normal track mode """
         if self.__view_returns:
-            return len(self.song().return_tracks)
+            return len(self.live_snapshot().return_tracks())
         else:
-            return len(self.song().visible_tracks)
+            return len(self.live_snapshot().visible_tracks())
 
     def __send_parameter(self, strip_index, stack_index):
         """ Return the send parameter that is assigned to the given channel strip """
         assert self.__assignment_mode == CSM_SENDS
         send_index = strip_index + stack_index + self.__send_mode_offset
-        if send_index < len(self.song().view.selected_track.mixer_device.sends):
-            p = self.song().view.selected_track.mixer_device.sends[send_index]
+        sends = self.live_snapshot().selected_track().mixer_device.sends
+        if send_index < len(sends):
+            p = sends[send_index]
             return (p, p.name)
         return (None, None)
 
@@ -374,10 +388,7 @@ class ChannelStripController(MackieControlComponent):
             assert 0
 
     def __any_fader_is_touched(self):
-        for s in self.__channel_strips:
-            if s.is_touched():
-                return True
-        return False
+        return len(self.__touched_strips) > 0
 
     def __can_switch_to_prev_page(self):
         """ Return true if pressing the "next" button will have any effect """
@@ -391,7 +402,7 @@ class ChannelStripController(MackieControlComponent):
     def __can_switch_to_next_page(self):
         """ Return true if pressing the "prev" button will have any effect """
         if self.__assignment_mode == CSM_PLUGINS:
-            sel_track = self.song().view.selected_track
+            sel_track = self.live_snapshot().selected_track()
             if self.__plugin_mode == PCM_DEVICES:
                 return self.__plugin_mode_offsets[PCM_DEVICES] + len(self.__channel_strips) < len(sel_track.devices)
             if self.__plugin_mode == PCM_PARAMETERS:
@@ -401,22 +412,14 @@ class ChannelStripController(MackieControlComponent):
             assert 0
         else:
             if self.__assignment_mode == CSM_SENDS:
-                return self.__send_mode_offset + len(self.__channel_strips) < len(self.song().return_tracks)
+                return self.__send_mode_offset + len(self.__channel_strips) < len(self.live_snapshot().return_tracks())
             return False
 
     def __available_routing_targets(self, channel_strip):
         assert self.__assignment_mode == CSM_IO
         t = channel_strip.assigned_track()
         if t:
-            if self.__sub_mode_in_io_mode == CSM_IO_MODE_INPUT_MAIN:
-                return flatten_target_list(t.available_input_routing_types)
-            if self.__sub_mode_in_io_mode == CSM_IO_MODE_INPUT_SUB:
-                return flatten_target_list(t.available_input_routing_channels)
-            if self.__sub_mode_in_io_mode == CSM_IO_MODE_OUTPUT_MAIN:
-                return flatten_target_list(t.available_output_routing_types)
-            if self.__sub_mode_in_io_mode == CSM_IO_MODE_OUTPUT_SUB:
-                return flatten_target_list(t.available_output_routing_channels)
-            assert 0
+            return self.__routing_targets.names(t, self.__sub_mode_in_io_mode)
         else:
             return None
 
@@ -424,15 +427,7 @@ class ChannelStripController(MackieControlComponent):
         assert self.__assignment_mode == CSM_IO
         t = channel_strip.assigned_track()
         if t:
-            if self.__sub_mode_in_io_mode == CSM_IO_MODE_INPUT_MAIN:
-                return flatten_target(t.input_routing_type)
-            if self.__sub_mode_in_io_mode == CSM_IO_MODE_INPUT_SUB:
-                return flatten_target(t.input_routing_channel)
-            if self.__sub_mode_in_io_mode == CSM_IO_MODE_OUTPUT_MAIN:
-                return flatten_target(t.output_routing_type)
-            if self.__sub_mode_in_io_mode == CSM_IO_MODE_OUTPUT_SUB:
-                return flatten_target(t.output_routing_channel)
-            assert 0
+            return flatten_target(getattr(t, routing_target_properties[self.__sub_mode_in_io_mode]))
         else:
             return None
 
@@ -440,14 +435,15 @@ class ChannelStripController(MackieControlComponent):
         assert self.__assignment_mode == CSM_IO
         t = channel_strip.assigned_track()
         if t:
+            target = self.__routing_targets.target_by_name(t, self.__sub_mode_in_io_mode, target_string)
             if self.__sub_mode_in_io_mode == CSM_IO_MODE_INPUT_MAIN:
-                t.input_routing_type = target_by_name(t.available_input_routing_types, target_string)
+                t.input_routing_type = target
             elif self.__sub_mode_in_io_mode == CSM_IO_MODE_INPUT_SUB:
-                t.input_routing_channel = target_by_name(t.available_input_routing_channels, target_string)
+                t.input_routing_channel = target
             elif self.__sub_mode_in_io_mode == CSM_IO_MODE_OUTPUT_MAIN:
-                t.output_routing_type = target_by_name(t.available_output_routing_types, target_string)
+                t.output_routing_type = target
             elif self.__sub_mode_in_io_mode == CSM_IO_MODE_OUTPUT_SUB:
-                t.output_routing_channel = target_by_name(t.available_output_routing_channels, target_string)
+                t.output_routing_channel = target
             else:
                 assert 0
 
@@ -471,11 +467,7 @@ class ChannelStripController(MackieControlComponent):
         self.request_rebuild_midi_map()
 
     def __set_assignment_mode(self, mode):
-        for plugin in self.__displayed_plugins:
-            if plugin != None:
-                plugin.remove_name_listener(self.__update_plugin_names)
-
-        self.__displayed_plugins = []
+        self.__routing_targets.clear()
         if mode == CSM_PLUGINS:
             self.__assignment_mode = mode
             self.__main_display_controller.set_show_parameter_names(True)
@@ -493,6 +485,8 @@ class ChannelStripController(MackieControlComponent):
                 self.__assignment_mode = mode
             elif self.__assignment_mode == CSM_IO:
                 self.__switch_to_next_io_mode()
+        self.__update_routing_listeners()
+        self.__update_displayed_plugins()
         self.__apply_meter_mode()
         self.__reassign_channel_strip_parameters(for_display_only=False)
         self.__update_channel_strip_strings()
@@ -515,12 +509,7 @@ class ChannelStripController(MackieControlComponent):
             self.request_rebuild_midi_map()
             if self.__plugin_mode == PCM_DEVICES:
                 self.__update_vpot_leds_in_plugins_device_choose_mode()
-            else:
-                for plugin in self.__displayed_plugins:
-                    if plugin != None:
-                        plugin.remove_name_listener(self.__update_plugin_names)
-
-                self.__displayed_plugins = []
+            self.__update_displayed_plugins()
             self.__update_page_switch_status()
             self.__update_flip_led()
 
@@ -536,6 +525,7 @@ class ChannelStripController(MackieControlComponent):
                     #self.__update_vpot_leds_in_plugins_device_choose_mode()
             elif self.__assignment_mode == CSM_SENDS:
                 self.__send_mode_offset -= len(self.__channel_strips)
+            self.__update_displayed_plugins()
             self.__reassign_channel_strip_parameters(for_display_only=False)
             self.__update_channel_strip_strings()
             self.__update_page_switch_status()
@@ -555,6 +545,7 @@ class ChannelStripController(MackieControlComponent):
                 self.__send_mode_offset += len(self.__channel_strips)
             else:
                 assert 0
+            self.__update_displayed_plugins()
             self.__reassign_channel_strip_parameters(for_display_only=False)
             self.__update_channel_strip_strings()
             self.__update_page_switch_status()
@@ -571,9 +562,13 @@ class ChannelStripController(MackieControlComponent):
         for s in self.__channel_strips:
             s.set_bank_and_channel_offset(self.__strip_offset(), self.__view_returns, self.__within_track_added_or_deleted)
 
+        self.__update_routing_listeners()
+        self.track_subscriptions().release_unused()
+        self.__routing_targets.clear()
+
     def __reassign_channel_strip_parameters(self, for_display_only):
         """ Reevaluate all v-pot/fader -> parameter assignments """
-        display_parameters = []
+        self.__display_parameter_pairs = []
         for s in self.__channel_strips:
             vpot_param = (None, None)
             slider_param = (None, None)
@@ -601,22 +596,27 @@ class ChannelStripController(MackieControlComponent):
                 if s.assigned_track() and s.assigned_track().has_audio_output:
                     slider_param = (s.assigned_track().mixer_device.volume, u'Volume')
             if self.__flip and self.__can_flip():
-                if self.__any_fader_is_touched():
-                    display_parameters.append(vpot_param)
-                else:
-                    display_parameters.append(slider_param)
+                self.__display_parameter_pairs.append((slider_param, vpot_param))
                 if not for_display_only:
                     s.set_v_pot_parameter(slider_param[0], slider_display_mode)
                     s.set_fader_parameter(vpot_param[0])
             else:
-                if self.__any_fader_is_touched():
-                    display_parameters.append(slider_param)
-                else:
-                    display_parameters.append(vpot_param)
+                self.__display_parameter_pairs.append((vpot_param, slider_param))
                 if not for_display_only:
                     s.set_v_pot_parameter(vpot_param[0], vpot_display_mode)
                     s.set_fader_parameter(slider_param[0])
 
+        self.__update_display_parameters()
+
+    def __update_display_parameters(self):
+        """
+            Each strip shows the first of its display parameter pair, or the second one
+            while any fader is touched
+        """
+        if self.__any_fader_is_touched():
+            display_parameters = [ touched for untouched, touched in self.__display_parameter_pairs ]
+        else:
+            display_parameters = [ untouched for untouched, touched in self.__display_parameter_pairs ]
         self.__main_display_controller.set_channel_offset(self.__strip_offset())
         if len(display_parameters):
             self.__main_display_controller.set_parameters(display_parameters)
@@ -656,17 +656,22 @@ class ChannelStripController(MackieControlComponent):
         self.__update_view_returns_mode()
 
     def __update_rude_solo_led(self):
-        any_track_soloed = False
-        for t in chain(self.song().tracks, self.song().return_tracks):
-            if t.solo:
-                any_track_soloed = True
-                break
-
-        if any_track_soloed:
+        """ Called by the track index whenever 'any soloed' flips """
+        if self.track_index().any_soloed():
             self.send_midi((NOTE_ON_STATUS, SELECT_RUDE_SOLO, BUTTON_STATE_ON))
         else:
             self.send_midi((NOTE_ON_STATUS, SELECT_RUDE_SOLO, BUTTON_STATE_OFF))
 
+    def __update_selected_track_leds(self, old_selected_track, new_selected_track):
+        """
+            Only the strips showing the previously or the newly selected track need to update
+            their select LED. The strips of the extensions listen to the selection themselves.
+        """
+        for s in self.__own_channel_strips:
+            track = s.assigned_track()
+            if track != None and (track == old_selected_track or track == new_selected_track):
+                s.update_track_is_selected_led()
+
     def __update_page_switch_status(self):
         """ Visualize if the "prev" and "next" buttons can be pressed """
         if self.__can_switch_to_prev_page():
@@ -692,7 +697,7 @@ class ChannelStripController(MackieControlComponent):
         """
         assert self.__assignment_mode == CSM_PLUGINS
         assert self.__plugin_mode == PCM_DEVICES
-        sel_track = self.song().view.selected_track
+        sel_track = self.live_snapshot().selected_track()
         count = 0
         for s in self.__channel_strips:
             offset = self.__plugin_mode_offsets[self.__plugin_mode]
@@ -704,32 +709,87 @@ class ChannelStripController(MackieControlComponent):
 
     def __update_channel_strip_strings(self):
         """ In IO mode, collect all strings that will be visible in the main display manually """
+        if self.defer_to_batch_end(self.__update_channel_strip_strings):
+            return
         if not self.__any_fader_is_touched():
             if self.__assignment_mode == CSM_IO:
-                targets = []
-                for s in self.__channel_strips:
-                    if self.__routing_target(s):
-                        targets.append(self.__routing_target(s))
-                    else:
-                        targets.append(u'')
-
-                self.__main_display_controller.set_channel_strip_strings(targets)
+                """ Only read from Live after a routing, the bank or the sub mode changed """
+                if self.__io_strip_strings == None:
+                    targets = []
+                    for s in self.__channel_strips:
+                        target = self.__routing_target(s)
+                        if target:
+                            targets.append(target)
+                        else:
+                            targets.append(u'')
+
+                    self.__io_strip_strings = targets
+                self.__main_display_controller.set_channel_strip_strings(list(self.__io_strip_strings))
             elif self.__assignment_mode == CSM_PLUGINS and self.__plugin_mode == PCM_DEVICES:
-                for plugin in self.__displayed_plugins:
-                    if plugin != None:
-                        plugin.remove_name_listener(self.__update_plugin_names)
-
-                self.__displayed_plugins = []
-                sel_track = self.song().view.selected_track
-                for i in range(len(self.__channel_strips)):
-                    device_index = i + self.__plugin_mode_offsets[PCM_DEVICES]
-                    if device_index >= 0 and device_index < len(sel_track.devices):
-                        sel_track.devices[device_index].add_name_listener(self.__update_plugin_names)
-                        self.__displayed_plugins.append(sel_track.devices[device_index])
-                    else:
-                        self.__displayed_plugins.append(None)
+                """ The names get updated from the name listeners, see '__update_displayed_plugins' """
+                if self.__plugin_name_strings != None:
+                    self.__main_display_controller.set_channel_strip_strings(list(self.__plugin_name_strings))
+
+    def __update_routing_listeners(self):
+        """
+            In IO mode, follow the routing that is shown for the tracks on the strips, and
+            the available targets too, as renaming a target only changes those
+        """
+        self.__release_routing_listeners()
+        if self.__assignment_mode == CSM_IO:
+            properties = (routing_target_properties[self.__sub_mode_in_io_mode], available_routing_targets_properties[self.__sub_mode_in_io_mode])
+            for s in self.__channel_strips:
+                t = s.assigned_track()
+                if t:
+                    for property in properties:
+                        self.track_subscriptions().add_listener(t, property, self.__on_routing_changed)
+                        self.__routing_subscriptions.append((t, property))
+
+        self.__io_strip_strings = None
+
+    def __release_routing_listeners(self):
+        for track, property in self.__routing_subscriptions:
+            self.track_subscriptions().remove_listener(track, property, self.__on_routing_changed)
+
+        self.__routing_subscriptions = []
+
+    @batched
+    def __on_routing_changed(self):
+        self.__io_strip_strings = None
+        self.__update_channel_strip_strings()
+
+    def __update_displayed_plugins(self):
+        """
+            Follow the names of the devices that can be chosen on the current page. Only
+            devices that enter or leave the page get their name listener added or removed
+        """
+        plugins = []
+        if self.__assignment_mode == CSM_PLUGINS and self.__plugin_mode == PCM_DEVICES:
+            sel_track = self.live_snapshot().selected_track()
+            devices = sel_track.devices
+            for i in range(len(self.__channel_strips)):
+                device_index = i + self.__plugin_mode_offsets[PCM_DEVICES]
+                if device_index >= 0 and device_index < len(devices):
+                    plugins.append(devices[device_index])
+                else:
+                    plugins.append(None)
+
+        displayed_keys = [ liveobj_key(p) for p in self.__displayed_plugins if p != None ]
+        plugin_keys = [ liveobj_key(p) for p in plugins if p != None ]
+        for plugin in self.__displayed_plugins:
+            if plugin != None and liveobj_key(plugin) not in plugin_keys:
+                if liveobj_valid(plugin) and plugin.name_has_listener(self.__update_plugin_names):
+                    plugin.remove_name_listener(self.__update_plugin_names)
 
-                self.__update_plugin_names()
+        for plugin in plugins:
+            if plugin != None and liveobj_key(plugin) not in displayed_keys:
+                plugin.add_name_listener(self.__update_plugin_names)
+
+        self.__displayed_plugins = plugins
+        if plugins:
+            self.__update_plugin_names()
+        else:
+            self.__plugin_name_strings = None
 
     def __update_plugin_names(self):
         assert self.__assignment_mode == CSM_PLUGINS and self.__plugin_mode == PCM_DEVICES
@@ -740,7 +800,8 @@ class ChannelStripController(MackieControlComponent):
             else:
                 device_strings.append(u'')
 
-        self.__main_display_controller.set_channel_strip_strings(device_strings)
+        self.__plugin_name_strings = device_strings
+        self.__main_display_controller.set_channel_strip_strings(list(device_strings))
 
     def __update_view_returns_mode(self):
         """ Update the control return tracks LED """
@@ -753,12 +814,15 @@ class ChannelStripController(MackieControlComponent):
         self.__reassign_channel_strip_parameters(for_display_only=False)
         self.request_rebuild_midi_map()
 
+    @batched
     def __on_selected_track_changed(self):
         """ Notifier, called as soon as the selected track has changed """
+        self.live_snapshot().invalidate()
         st = self.__last_attached_selected_track
         if st and st.devices_has_listener(self.__on_selected_device_chain_changed):
             st.remove_devices_listener(self.__on_selected_device_chain_changed)
-        self.__last_attached_selected_track = self.song().view.selected_track
+        self.__last_attached_selected_track = self.live_snapshot().selected_track()
+        self.__update_selected_track_leds(st, self.__last_attached_selected_track)
         st = self.__last_attached_selected_track
         if st:
             st.add_devices_listener(self.__on_selected_device_chain_changed)
@@ -769,6 +833,7 @@ class ChannelStripController(MackieControlComponent):
             self.__chosen_plugin = None
             self.__ordered_plugin_parameters = []
             if self.__plugin_mode == PCM_DEVICES:
+                self.__update_displayed_plugins()
                 self.__update_vpot_leds_in_plugins_device_choose_mode()
             else:
                 self.__set_plugin_mode(PCM_DEVICES)
@@ -777,9 +842,9 @@ class ChannelStripController(MackieControlComponent):
             self.request_rebuild_midi_map()
 
         """ Channel Bank switch offset added """
-        all_tracks = ((self.song().tracks + self.song().return_tracks) + (self.song().master_track,))
-        index = (int(list(all_tracks).index(st)/8))*8
-        self.__set_channel_offset(index)
+        position = self.track_index().track_position(st)
+        if position != None:
+            self.__set_channel_offset((position // 8) * 8)
 
     def __on_flip_changed(self):
         """ Update the flip button LED when the flip mode changed """
@@ -788,10 +853,12 @@ class ChannelStripController(MackieControlComponent):
             self.__reassign_channel_strip_parameters(for_display_only=False)
             self.request_rebuild_midi_map()
 
+    @batched
     def __on_selected_device_chain_changed(self):
         if self.__assignment_mode == CSM_PLUGINS:
             if self.__plugin_mode == PCM_DEVICES:
                 #self.__update_vpot_leds_in_plugins_device_choose_mode()
+                self.__update_displayed_plugins()
                 self.__update_page_switch_status()
             elif self.__plugin_mode == PCM_PARAMETERS:
                 if not self.__chosen_plugin:
@@ -802,38 +869,60 @@ class ChannelStripController(MackieControlComponent):
                     self.__chosen_plugin = None
                     self.__set_plugin_mode(PCM_DEVICES)
 
+    @batched
     def __on_tracks_added_or_deleted(self):
         """ Notifier, called as soon as tracks where added, removed or moved """
+        self.live_snapshot().invalidate()
+        self.track_index().invalidate()
         self.__within_track_added_or_deleted = True
-        for t in chain(self.song().visible_tracks, self.song().return_tracks):
-            if not t.solo_has_listener(self.__update_rude_solo_led):
-                t.add_solo_listener(self.__update_rude_solo_led)
-            if not t.has_audio_output_has_listener(self.__on_any_tracks_output_type_changed):
-                t.add_has_audio_output_listener(self.__on_any_tracks_output_type_changed)
-
-        if self.__send_mode_offset >= len(self.song().return_tracks):
+        self.__update_audio_output_listeners()
+        previous_tracks = [ s.assigned_track() for s in self.__own_channel_strips ]
+        if self.__send_mode_offset >= len(self.live_snapshot().return_tracks()):
             self.__send_mode_offset = 0
-            self.__reassign_channel_strip_parameters(for_display_only=False)
-            self.__update_channel_strip_strings()
         if self.__strip_offset() + len(self.__channel_strips) >= self.__controlled_num_of_tracks():
             self.__set_channel_offset(max(0, self.__controlled_num_of_tracks() - len(self.__channel_strips)))
-        self.__reassign_channel_strip_parameters(for_display_only=False)
-        self.__update_channel_strip_strings()
+        else:
+            """ Strips keeping their track skip their refresh (see 'ChannelStrip.set_bank_and_channel_offset') """
+            self.__reassign_channel_strip_offsets()
+            self.__reassign_channel_strip_parameters(for_display_only=False)
+            self.__update_channel_strip_strings()
         if self.__assignment_mode == CSM_SENDS:
             self.__update_page_switch_status()
-        self.refresh_state()
-        self.__main_display_controller.refresh_state()
+        for s, previous_track in zip(self.__own_channel_strips, previous_tracks):
+            if s.assigned_track() != previous_track:
+                s.update_track_is_selected_led()
+
         self.__within_track_added_or_deleted = False
         self.request_rebuild_midi_map()
 
+    def __update_audio_output_listeners(self):
+        """ Only attach to the tracks that got visible, and detach from the ones that are gone """
+        tracks = {}
+        for t in self.track_index().visible_tracks():
+            tracks[liveobj_key(t)] = t
+
+        for key in list(self.__audio_output_tracks.keys()):
+            if key not in tracks:
+                t = self.__audio_output_tracks.pop(key)
+                if liveobj_valid(t) and t.has_audio_output_has_listener(self.__on_any_tracks_output_type_changed):
+                    t.remove_has_audio_output_listener(self.__on_any_tracks_output_type_changed)
+
+        for key, t in tracks.items():
+            if key not in self.__audio_output_tracks:
+                t.add_has_audio_output_listener(self.__on_any_tracks_output_type_changed)
+                self.__audio_output_tracks[key] = t
+
+    @batched
     def __on_any_tracks_output_type_changed(self):
         """ Called as soon as any device chain has changed (devices where added/removed/swapped...) """
         self.__reassign_channel_strip_parameters(for_display_only=False)
         self.request_rebuild_midi_map()
 
+    @batched
     def __on_parameter_list_of_chosen_plugin_changed(self):
         assert self.__chosen_plugin != None
         assert self.__plugin_mode == PCM_PARAMETERS
+        self.__device_parameter_index.invalidate(self.__chosen_plugin)
         self.__reorder_parameters()
         self.__reassign_channel_strip_parameters(for_display_only=False)
         self.request_rebuild_midi_map()
@@ -841,15 +930,14 @@ class ChannelStripController(MackieControlComponent):
     def __reorder_parameters(self):
         result = []
         if self.__chosen_plugin:
-            if self.__chosen_plugin.class_name in list(DEVICE_DICT.keys()):
-                device_banks = DEVICE_DICT[self.__chosen_plugin.class_name]
-                for bank in device_banks:
-                    for param_name in bank:
-                        parameter_name = u''
-                        parameter = get_parameter_by_name(self.__chosen_plugin, param_name)
-                        if parameter:
-                            parameter_name = parameter.name
-                        result.append((parameter, parameter_name))
+            bank_layout = self.__device_parameter_index.bank_layout(self.__chosen_plugin)
+            if bank_layout != None:
+                for param_name in bank_layout:
+                    parameter_name = u''
+                    parameter = self.__device_parameter_index.parameter_by_name(self.__chosen_plugin, param_name)
+                    if parameter:
+                        parameter_name = parameter.name
+                    result.append((parameter, parameter_name))
 
             else:
                 result = [ (p, p.name) for p in self.__chosen_plugin.parameters[1:] ]
@@ -0,0 +1,44 @@
+from __future__ import absolute_import, print_function, unicode_literals
+from builtins import object
+from _Generic.Devices import *
+from .MackieControlComponent import *
+from .LruCache import LruCache
+
+class DeviceParameterIndex(object):
+    """
+        Speeds up laying out the parameters of a device into the banks of DEVICE_DICT:
+        - the bank layout (the parameter names of all banks in order) is compiled once
+          per device class
+        - the parameters of a device are indexed by their original name once, instead
+          of scanning them for every bank slot (see 'get_parameter_by_name')
+
+        The index of a device has to be invalidated whenever its parameter list changed.
+    """
+
+    def __init__(self, cache_size = DEVICE_PARAMETER_INDEX_CACHE_SIZE):
+        self.__bank_layouts = LruCache(cache_size)
+        self.__parameter_indices = LruCache(cache_size)
+
+    def bank_layout(self, device):
+        """ The parameter names of the devices banks, or None if there are no banks for it """
+        return self.__bank_layouts.get(device.class_name, self.__compile_bank_layout)
+
+    def parameter_by_name(self, device, name):
+        """ Same as 'get_parameter_by_name': the first parameter with that original name """
+        index = self.__parameter_indices.get(liveobj_key(device), lambda key: self.__index_parameters(device))
+        return index.get(name)
+
+    def invalidate(self, device):
+        self.__parameter_indices.invalidate(liveobj_key(device))
+
+    def __compile_bank_layout(self, class_name):
+        if class_name not in DEVICE_DICT:
+            return None
+        return tuple([ param_name for bank in DEVICE_DICT[class_name] for param_name in bank ])
+
+    def __index_parameters(self, device):
+        index = {}
+        for parameter in device.parameters:
+            index.setdefault(parameter.original_name, parameter)
+
+        return index
@@ -0,0 +1,99 @@
+from __future__ import absolute_import, print_function, unicode_literals
+from contextlib import contextmanager
+from functools import partial
+from .MackieControlComponent import *
+
+class LiveSnapshot(MackieControlComponent):
+    """
+        Memoizes the values that many components read from Live during one frame, that
+        is one call of 'update_display' or 'receive_midi' of the main script.
+        Outside of a frame all reads go to Live directly.
+
+        Values that Live notifies about are forgotten as soon as they change, the rest
+        (can_undo, can_redo) only live until the end of the frame. Listeners that might
+        run before ours and read from here should call 'invalidate' first, as Live does
+        not guarantee an order (the same as with the 'TrackIndex').
+
+        'live_reads' counts the reads of the memoized values that actually went to Live,
+        not the reads that components make without the snapshot.
+    """
+
+    def __init__(self, main_script):
+        MackieControlComponent.__init__(self, main_script)
+        self.__frame_depth = 0
+        self.__values = {}
+        self.__live_reads = 0
+        self.__listeners = []
+        song = MackieControlComponent.song(self)
+        for owner, property in ((song, u'visible_tracks'),
+         (song, u'return_tracks'),
+         (song, u'is_playing'),
+         (song.view, u'selected_track')):
+            listener = partial(self.__forget, property)
+            getattr(owner, u'add_{}_listener'.format(property))(listener)
+            self.__listeners.append((owner, property, listener))
+
+    def destroy(self):
+        for owner, property, listener in self.__listeners:
+            if getattr(owner, u'{}_has_listener'.format(property))(listener):
+                getattr(owner, u'remove_{}_listener'.format(property))(listener)
+
+        self.__listeners = []
+        self.invalidate()
+        MackieControlComponent.destroy(self)
+
+    @contextmanager
+    def frame(self):
+        self.__frame_depth += 1
+        try:
+            yield
+        finally:
+            self.__frame_depth -= 1
+            if self.__frame_depth == 0:
+                self.invalidate()
+
+    def invalidate(self):
+        self.__values = {}
+
+    def live_reads(self):
+        """ The number of reads of memoized values that went to Live """
+        return self.__live_reads
+
+    def song(self):
+        return self.__memoized(u'song', partial(MackieControlComponent.song, self))
+
+    def visible_tracks(self):
+        return self.__memoized(u'visible_tracks', lambda : self.song().visible_tracks)
+
+    def return_tracks(self):
+        return self.__memoized(u'return_tracks', lambda : self.song().return_tracks)
+
+    def selected_track(self):
+        return self.__memoized(u'selected_track', lambda : self.__song_view().selected_track)
+
+    def is_playing(self):
+        return self.__memoized(u'is_playing', lambda : self.song().is_playing)
+
+    def can_undo(self):
+        return self.__memoized(u'can_undo', lambda : self.song().can_undo)
+
+    def can_redo(self):
+        return self.__memoized(u'can_redo', lambda : self.song().can_redo)
+
+    def __song_view(self):
+        return self.__memoized(u'view', lambda : self.song().view)
+
+    def __memoized(self, name, read):
+        if name in self.__values:
+            return self.__values[name]
+        self.__live_reads += 1
+        value = read()
+        if self.__frame_depth > 0:
+            self.__values[name] = value
+        return value
+
+    def __forget(self, name):
+        self.__values.pop(name, None)
+
+    def refresh_state(self):
+        self.invalidate()
@@ -0,0 +1,44 @@
+from __future__ import absolute_import, print_function, unicode_literals
+from builtins import object
+from collections import OrderedDict
+
+class LruCache(object):
+    """
+        A bounded mapping that forgets the least recently used entries first.
+        Counts hits and misses, so that one can check if the cache size fits.
+    """
+
+    def __init__(self, max_size):
+        assert max_size > 0
+        self.__max_size = max_size
+        self.__entries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    def get(self, key, create_value):
+        """ Returns the value cached for key, or caches and returns create_value(key) """
+        if key in self.__entries:
+            self.__hits += 1
+            value = self.__entries.pop(key)
+        else:
+            self.__misses += 1
+            value = create_value(key)
+            if len(self.__entries) >= self.__max_size:
+                self.__entries.popitem(last=False)
+        self.__entries[key] = value
+        return value
+
+    def invalidate(self, key):
+        self.__entries.pop(key, None)
+
+    def clear(self):
+        self.__entries.clear()
+
+    def hits(self):
+        return self.__hits
+
+    def misses(self):
+        return self.__misses
+
+    def __len__(self):
+        return len(self.__entries)
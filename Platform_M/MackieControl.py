@@ -2,7 +2,16 @@
 from __future__ import absolute_import, print_function, unicode_literals
 from builtins import range
 from builtins import object
+from contextlib import contextmanager
+from functools import partial
 from .consts import *
+from .keymap import compile_keymap, emulated_modifiers
+from .MidiOutput import MidiOutput
+from .TickScheduler import TickScheduler
+from .LiveSnapshot import LiveSnapshot
+from .TrackIndex import TrackIndex
+from .TrackSubscriptions import TrackSubscriptions
+from .MeterEngine import MeterEngine
 from .MainDisplay import MainDisplay
 from .MainDisplayController import MainDisplayController
 from .ChannelStrip import ChannelStrip, MasterChannelStrip
@@ -24,7 +33,21 @@ class MackieControl(object):
 
     def __init__(self, c_instance):
         self.__c_instance = c_instance
+        self.__midi_output = MidiOutput(c_instance.send_midi)
+        self.__tick_scheduler = TickScheduler()
+        self.__batch_depth = 0
+        self.__flushing_batch = False
+        self.__deferred_calls = []
+        self.__pending_rebuilds = []
+        self.__rebuild_requests = 0
+        self.__issued_rebuilds = 0
         self.__components = []
+        self.__live_snapshot = LiveSnapshot(self)
+        self.__components.append(self.__live_snapshot)
+        self.__track_index = TrackIndex(self)
+        self.__components.append(self.__track_index)
+        self.__track_subscriptions = TrackSubscriptions(self)
+        self.__components.append(self.__track_subscriptions)
         self.__main_display = MainDisplay(self)
         self.__components.append(self.__main_display)
         self.__main_display_controller = MainDisplayController(self, self.__main_display)
@@ -33,10 +56,14 @@ class MackieControl(object):
         self.__components.append(self.__software_controller)
         self.__transport = Transport(self)
         self.__components.append(self.__transport)
+        self.__meter_engine = MeterEngine(self)
         self.__channel_strips = [ ChannelStrip(self, i) for i in range(NUM_CHANNEL_STRIPS) ]
         for s in self.__channel_strips:
             self.__components.append(s)
 
+        self.__meter_engine.set_channel_strips(self.__channel_strips)
+        self.__components.append(self.__meter_engine)
+
         self.__master_strip = MasterChannelStrip(self)
         self.__components.append(self.__master_strip)
         self.__channel_strip_controller = ChannelStripController(self, self.__channel_strips, self.__master_strip, self.__main_display_controller)
@@ -44,16 +71,21 @@ class MackieControl(object):
         self.__master_is_pressed = False
         self.__shift_is_pressed = False
         self.__option_is_pressed = False
-        self.__ctrl_is_pressed = False
+        self.__control_is_pressed = False
         self.__alt_is_pressed = False
+        self.__modifier_state = 0
         self.is_pro_version = False
         self._received_firmware_version = False
         self._refresh_state_next_time = 0
+        self.__note_dispatch_table = self.__compile_note_dispatch_table()
 
     def disconnect(self):
         for c in self.__components:
             c.destroy()
 
+        self.__tick_scheduler.clear()
+        self.__midi_output.flush(force=True)
+
     def connect_script_instances(self, instanciated_scripts):
         """
             Called by the Application as soon as all scripts are initialized.
@@ -101,11 +133,32 @@ class MackieControl(object):
         """ Returns a reference to the Live Song that we do interact with """
         return self.__c_instance.song()
 
+    def live_snapshot(self):
+        """ Returns the memo of what was read from Live during the current frame (see 'LiveSnapshot') """
+        return self.__live_snapshot
+
+    def track_index(self):
+        """ Returns the index that maps the songs tracks to their positions (see 'TrackIndex') """
+        return self.__track_index
+
+    def tick_scheduler(self):
+        """ Returns the scheduler that runs the components periodic jobs (see 'TickScheduler') """
+        return self.__tick_scheduler
+
+    def meter_engine(self):
+        """ Returns the component that sends the level meters of our channel strips (see 'MeterEngine') """
+        return self.__meter_engine
+
+    def track_subscriptions(self):
+        """ Returns the track listeners shared by the channel strips (see 'TrackSubscriptions') """
+        return self.__track_subscriptions
+
     def handle(self):
         """ Returns a handle to the c_interface that is needed when forwarding MIDI events via the MIDI map """
         return self.__c_instance.handle()
 
     def refresh_state(self):
+        self.__invalidate_hardware_state()
         for c in self.__components:
             c.refresh_state()
 
@@ -115,7 +168,7 @@ class MackieControl(object):
     def is_extension(self):
         return False
 
-    def request_rebuild_midi_map(self):
+    def request_rebuild_midi_map(self, script = None):
         """
             To be called from any components, as soon as their internal state changed in a
             way, that we do need to remap the mappings that are processed directly by the
@@ -123,8 +176,75 @@ class MackieControl(object):
             Dont assume that the request will immediately result in a call to
             your build_midi_map function. For performance reasons this is only
             called once per GUI frame.
+            'script' is one of our extensions, to request its rebuild along with ours.
+            Within a batch, all requests are collected and issued once per script when
+            the batch ends (see 'batch').
+        """
+        if script == None:
+            script = self
+        self.__rebuild_requests += 1
+        if self.__batch_depth > 0:
+            if script not in self.__pending_rebuilds:
+                self.__pending_rebuilds.append(script)
+        else:
+            self.__issue_rebuild_midi_map(script)
+
+    def __issue_rebuild_midi_map(self, script):
+        self.__issued_rebuilds += 1
+        if script is self:
+            self.__c_instance.request_rebuild_midi_map()
+        else:
+            script.request_rebuild_midi_map()
+
+    def rebuild_requests(self):
+        """ Number of rebuild requests our components made, for checking the batching """
+        return self.__rebuild_requests
+
+    def issued_rebuilds(self):
+        """ Number of rebuild requests that were actually passed on to Live """
+        return self.__issued_rebuilds
+
+    @contextmanager
+    def batch(self):
+        """
+            Runs everything within the with statement as one operation: MIDI map rebuild
+            requests and calls deferred with 'defer_to_batch_end' are collected, and only
+            issued once when the outermost batch ends. Batches can be nested.
+        """
+        self.__batch_depth += 1
+        try:
+            yield
+        finally:
+            self.__end_batch()
+
+    def defer_to_batch_end(self, callback):
+        """
+            Returns True if 'callback' got deferred to the end of the current batch (only
+            once, no matter how often it got deferred), False if the caller has to go on
+            right away, because there is no batch to defer to.
         """
-        self.__c_instance.request_rebuild_midi_map()
+        if self.__batch_depth == 0 or self.__flushing_batch:
+            return False
+        if callback not in self.__deferred_calls:
+            self.__deferred_calls.append(callback)
+        return True
+
+    def __end_batch(self):
+        if self.__batch_depth == 1:
+            """ Still within the batch, so that the deferred calls' rebuild requests are collected too """
+            self.__flushing_batch = True
+            try:
+                while self.__deferred_calls:
+                    callback = self.__deferred_calls.pop(0)
+                    callback()
+            finally:
+                self.__flushing_batch = False
+        self.__batch_depth -= 1
+        if self.__batch_depth == 0:
+            pending_rebuilds = self.__pending_rebuilds
+            self.__pending_rebuilds = []
+            for script in pending_rebuilds:
+                self.__issue_rebuild_midi_map(script)
 
     def build_midi_map(self, midi_map_handle):
         """
@@ -133,140 +253,78 @@ class MackieControl(object):
             (see 'request_rebuild_midi_map' above) or when due to a change in Lives internal state,
             a rebuild is needed.
         """
+        """ Our own pending output has to reach the hardware before the feedback of the new mappings """
+        self.__midi_output.flush(force=True)
         for s in self.__channel_strips:
             s.build_midi_map(midi_map_handle)
 
         self.__master_strip.build_midi_map(midi_map_handle)
-        for i in range(SID_FIRST, SID_LAST + 1):
-            if i not in function_key_control_switch_ids:
-                Live.MidiMap.forward_midi_note(self.handle(), midi_map_handle, 0, i)
+        for i in forwarded_note_ids:
+            Live.MidiMap.forward_midi_note(self.handle(), midi_map_handle, 0, i)
 
         Live.MidiMap.forward_midi_cc(self.handle(), midi_map_handle, 0, JOG_WHEEL_CC_NO)
 
+    def __invalidate_hardware_state(self):
+        """ Forget what we know the hardware shows, so that everything gets sent again """
+        self.__midi_output.invalidate()
+        for s in self.__channel_strips:
+            s.invalidate_parameter_feedback()
+
+        self.__master_strip.invalidate_parameter_feedback()
+
     def update_display(self):
         """
             Live -> Script
             Aka on_timer. Called every 100 ms and should be used to update display relevant
             parts of the controller
         """
-        if self._refresh_state_next_time > 0:
-            self._refresh_state_next_time -= 1
-            if self._refresh_state_next_time == 0:
-                for c in self.__components:
-                    c.refresh_state()
+        self.__midi_output.start_tick()
+        with self.__live_snapshot.frame(), self.batch():
+            if self._refresh_state_next_time > 0:
+                self._refresh_state_next_time -= 1
+                if self._refresh_state_next_time == 0:
+                    self.__invalidate_hardware_state()
+                    for c in self.__components:
+                        c.refresh_state()
 
-                self.request_firmware_version()
-        for c in self.__components:
-            c.on_update_display_timer()
+                    self.request_firmware_version()
+            self.__tick_scheduler.run()
+
+        self.__midi_output.flush()
 
-    def send_midi(self, midi_event_bytes):
+    def send_midi(self, midi_event_bytes, repeat = 1):
         """
             Use this function to send MIDI events through Live to the real MIDI devices
-            that this script is assigned to.
+            that this script is assigned to. Note and CC messages that would not change
+            the hardware state are dropped, everything else is queued by priority and
+            flushed within the byte budget of the current tick (see 'MidiOutput').
         """
-        self.__c_instance.send_midi(midi_event_bytes)
+        self.__midi_output.send(midi_event_bytes, repeat)
+
+    def dropped_midi_messages(self):
+        """ Number of (meter) messages the MIDI output had to drop, as they didn't fit into a tick """
+        return self.__midi_output.dropped_messages()
 
     def receive_midi(self, midi_bytes):
+        with self.__live_snapshot.frame(), self.batch():
+            self.__dispatch_midi(midi_bytes)
+
+        self.__midi_output.flush()
+
+    def __dispatch_midi(self, midi_bytes):
         if midi_bytes[0] & 240 == NOTE_ON_STATUS or midi_bytes[0] & 240 == NOTE_OFF_STATUS:
-            note = midi_bytes[1]
             value = BUTTON_PRESSED if midi_bytes[2] > 0 else BUTTON_RELEASED
-            if note in range(SID_FIRST, SID_LAST + 1):
-                if note in function_master_switch_ids:
-                    self.__software_controller.handle_master_switch_ids(note, value)
-                if note in channel_strip_switch_ids + fader_touch_switch_ids:
-                    if self.__master_is_pressed:
-                        if note in range(24, 32):
-                            """
-                                Select 1 (24) = FUNC_METRONOME (121)
-                                Select 2 (25) = FUNC_FOLLOW_SONG (122)
-                                Select 3 (26) = FUNC_ENTER (123) Draw
-                                Select 4 (27) = MOD_SHIFT (124)
-                                Select 5 (28) = MOD_CTRL (125)
-                                Select 6 (29) = MOD_ALT (126)
-                                Select 7 (30) = FUNC_REDO (127)
-                                Select 8 (31) = FUNC_UNDO (128)
-                            """
-                            note += 97
-                        elif note in range(32, 38):
-                            """
-                                V-POT Push 1 (32) = ASSIGNMENT_IO (40)
-                                V-POT Push 2 (33) = ASSIGNMENT_SENDS (41)
-                                V-POT Push 3 (34) = ASSIGNMENT_PAN (42)
-                                V-POT Push 4 (35) = ASSIGNMENT_PLUG_INS (43)
-                                V-POT Push 5 (36) = ASSIGNMENT_EQ (44) << Previous page
-                                V-POT Push 6 (37) = ASSIGNMENT_DYNAMIC (45) Next page >>
-                            """
-                            note += 8
-                        elif note == 38:
-                            """ V-POT Push 7 = FADERBANK_EDIT (51) Returns """
-                            note += 13
-                        elif note == 39:
-                            """ V-POT Push 8 = DISPLAY_TIME (120) """
-                            note = 120
-                        elif note == 112:
-                            """ Master Fader Touch = Toggle Master volume/Cue volume """
-                            note = 133 #Dummy note
-                            self.__channel_strip_controller.toggle_master_cue_volume(value)
-                    elif note == 27 and value == BUTTON_RELEASED:
-                        if self.shift_is_pressed():
-                            self.set_shift_is_pressed(False)
-                    elif note == 28 and value == BUTTON_RELEASED:
-                        if self.control_is_pressed():
-                            self.set_control_is_pressed(False)
-                    elif note == 29 and value == BUTTON_RELEASED:
-                        if self.alt_is_pressed():
-                            self.set_alt_is_pressed(False)
-                    for s in self.__channel_strips:
-                        s.handle_channel_strip_switch_ids(note, value)
-                if note in channel_strip_assignment_switch_ids:
-                    self.__channel_strip_controller.handle_assignment_switch_ids(note, value)
-                    """ Missing line added """
-                if note in channel_strip_control_switch_ids:
-                    if self.__master_is_pressed:
-                        if note == 46 or note == 47:
-                            """
-                                FADERBANK_PREV_BANK (46) = MARKER_LOOP_START (129)
-                                FADERBANK_NEXT_BANK (47) = MARKER_LOOP_END (130)
-                            """
-                            note += 83
-                        elif note == 48 or note == 49:
-                            """
-                                FADERBANK_PREV_CH (48) = MARKER_PI (87)
-                                FADERBANK_NEXT_CH (49) = MARKER_PO (88)
-                            """
-                            note += 39
-                            """ Missing line added """
-                    self.__channel_strip_controller.handle_control_switch_ids(note, value)
-                if note in function_key_control_switch_ids:
-                    self.__software_controller.handle_function_key_switch_ids(note, value)
-                if note in jog_wheel_switch_ids:
-                    if self.__master_is_pressed:
-                        """ SID_JOG_ZOOM = SID_FUNC_MIXER (83) """
-                        if note == 75:
-                            note = 83
-                    self.__transport.handle_jog_wheel_switch_ids(note, value)
-                if note in software_controls_switch_ids:
-                    self.__software_controller.handle_software_controls_switch_ids(note, value)
-                if note in transport_control_switch_ids:
-                    if self.__master_is_pressed:
-                        """ TRANSPORT_STOP = Determine and show assignment mode """
-                        if note == 93:
-                            note = 133 #Dummy note
-                            self.__channel_strip_controller.determine_assignment_mode(value)
-                    self.__transport.handle_transport_switch_ids(note, value)
-                if note in marker_control_switch_ids:
-                    self.__transport.handle_marker_switch_ids(note, value)
-                if note in display_switch_ids:
-                    self.handle_display_switch_ids(note, value)
+            for handler in self.__note_dispatch_table[self.__modifier_state][midi_bytes[1]]:
+                handler(value)
 
         elif midi_bytes[0] & 240 == CC_STATUS:
             cc_no = midi_bytes[1]
             cc_value = midi_bytes[2]
             if cc_no == JOG_WHEEL_CC_NO:
                 self.__transport.handle_jog_wheel_rotation(cc_value)
-            elif cc_no in range(FID_PANNING_BASE, FID_PANNING_BASE + NUM_CHANNEL_STRIPS):
-                for s in self.__channel_strips:
-                    s.handle_vpot_rotation(cc_no - FID_PANNING_BASE, cc_value)
+            elif FID_PANNING_BASE <= cc_no < FID_PANNING_BASE + NUM_CHANNEL_STRIPS:
+                strip_index = cc_no - FID_PANNING_BASE
+                self.__channel_strips[strip_index].handle_vpot_rotation(strip_index, cc_value)
 
         elif midi_bytes[0] == 240 and len(midi_bytes) == 12 and midi_bytes[5] == 20:
             version_bytes = midi_bytes[6:-2]
@@ -274,6 +332,59 @@ class MackieControl(object):
             self.is_pro_version = major_version > 50
             self._received_firmware_version = True
 
+    def __compile_note_dispatch_table(self):
+        """
+            Compiles the note dispatching of 'receive_midi' once at startup: For every modifier
+            state, every note number maps to the tuple of handlers (bound to the switch id the
+            keymap remaps the note to) it has to be forwarded to, so that dispatching a note
+            costs one lookup instead of walking all the switch id lists.
+        """
+        keymap = compile_keymap()
+        modifiers = emulated_modifiers()
+        return tuple([ tuple([ self.__note_handlers(note, keymap[modifier_state][note], modifier_state, modifiers) for note in range(128) ]) for modifier_state in range(NUM_MODIFIER_STATES) ])
+
+    def __note_handlers(self, note, switch_id, modifier_state, modifiers):
+        """ Returns the handlers for the given note, each only expecting the button value """
+        handlers = []
+        if note in range(SID_FIRST, SID_LAST + 1):
+            if note in modifiers and not modifier_state & modifiers[note][0]:
+                handlers.append(partial(self.__release_emulated_modifier, modifiers[note][1]))
+            if switch_id in function_master_switch_ids:
+                handlers.append(partial(self.__software_controller.handle_master_switch_ids, switch_id))
+            if switch_id in channel_strip_switch_address:
+                """ Only the strip the switch belongs to gets called """
+                strip_index = channel_strip_switch_address[switch_id][1]
+                if strip_index < len(self.__channel_strips):
+                    handlers.append(partial(self.__channel_strips[strip_index].handle_channel_strip_switch_ids, switch_id))
+            if switch_id in channel_strip_assignment_switch_ids:
+                handlers.append(partial(self.__channel_strip_controller.handle_assignment_switch_ids, switch_id))
+            if switch_id in channel_strip_control_switch_ids:
+                handlers.append(partial(self.__channel_strip_controller.handle_control_switch_ids, switch_id))
+            if switch_id in function_key_control_switch_ids:
+                handlers.append(partial(self.__software_controller.handle_function_key_switch_ids, switch_id))
+            if switch_id in jog_wheel_switch_ids:
+                handlers.append(partial(self.__transport.handle_jog_wheel_switch_ids, switch_id))
+            if switch_id in software_controls_switch_ids:
+                handlers.append(partial(self.__software_controller.handle_software_controls_switch_ids, switch_id))
+            if switch_id in transport_control_switch_ids:
+                handlers.append(partial(self.__transport.handle_transport_switch_ids, switch_id))
+            if switch_id in marker_control_switch_ids:
+                handlers.append(partial(self.__transport.handle_marker_switch_ids, switch_id))
+            if switch_id in display_switch_ids:
+                handlers.append(partial(self.handle_display_switch_ids, switch_id))
+            if switch_id == SID_MASTER_CUE_VOLUME:
+                """ Toggle Master volume/Cue volume """
+                handlers.append(self.__channel_strip_controller.toggle_master_cue_volume)
+            elif switch_id == SID_SHOW_ASSIGNMENT_MODE:
+                """ Determine and show assignment mode """
+                handlers.append(self.__channel_strip_controller.determine_assignment_mode)
+        return tuple(handlers)
+
+    def __release_emulated_modifier(self, modifier_switch_id, value):
+        """ Releasing e.g. Select 4 (Shift) after Master also releases the modifier it emulates """
+        if value == BUTTON_RELEASED:
+            self.__software_controller.handle_software_controls_switch_ids(modifier_switch_id, value)
+
     def can_lock_to_devices(self):
         return False
 
@@ -294,12 +405,14 @@ class MackieControl(object):
 
     def set_master_is_pressed(self, pressed):
         self.__master_is_pressed = pressed
+        self.__set_modifier(MOD_MASTER, pressed)
 
     def shift_is_pressed(self):
         return self.__shift_is_pressed
 
     def set_shift_is_pressed(self, pressed):
         self.__shift_is_pressed = pressed
+        self.__set_modifier(MOD_SHIFT, pressed)
 
     #def option_is_pressed(self):
         #return self.__option_is_pressed
@@ -312,12 +425,20 @@ class MackieControl(object):
 
     def set_control_is_pressed(self, pressed):
         self.__control_is_pressed = pressed
+        self.__set_modifier(MOD_CTRL, pressed)
 
     def alt_is_pressed(self):
         return self.__alt_is_pressed
 
     def set_alt_is_pressed(self, pressed):
         self.__alt_is_pressed = pressed
+        self.__set_modifier(MOD_ALT, pressed)
+
+    def __set_modifier(self, modifier, pressed):
+        if pressed:
+            self.__modifier_state |= modifier
+        else:
+            self.__modifier_state &= ~modifier
 
     def handle_display_switch_ids(self, switch_id, value):
         if switch_id == SID_DISPLAY_NAME_VALUE:
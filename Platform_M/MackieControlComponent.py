@@ -1,9 +1,26 @@
 #Embedded file name: /Users/versonator/Jenkins/live/output/Live/mac_64_static/Release/python-bundle/MIDI Remote Scripts/MackieControl/MackieControlComponent.py
 from __future__ import absolute_import, print_function, unicode_literals
 from builtins import object
+from functools import wraps
 from .consts import *
 import Live
 
+def liveobj_key(liveobj):
+    """ The python wrappers of Live objects are not unique, the object they wrap is """
+    return getattr(liveobj, u'_live_ptr', liveobj)
+
+
+def batched(method):
+    """ Runs a (listener) method of a component as one batch (see 'MackieControl.batch') """
+
+    @wraps(method)
+    def batched_method(self, *a, **k):
+        with self.main_script().batch():
+            return method(self, *a, **k)
+
+    return batched_method
+
+
 class MackieControlComponent(object):
     """ Baseclass for every 'sub component' of the Mackie Control. Just offers some """
 
@@ -40,8 +57,29 @@ class MackieControlComponent(object):
     def application(self):
         return self.__main_script.application()
 
-    def send_midi(self, bytes):
-        self.__main_script.send_midi(bytes)
+    def live_snapshot(self):
+        return self.__main_script.live_snapshot()
+
+    def track_index(self):
+        return self.__main_script.track_index()
+
+    def meter_engine(self):
+        return self.__main_script.meter_engine()
+
+    def track_subscriptions(self):
+        return self.__main_script.track_subscriptions()
+
+    def send_midi(self, bytes, repeat = 1):
+        self.__main_script.send_midi(bytes, repeat)
 
     def request_rebuild_midi_map(self):
         self.__main_script.request_rebuild_midi_map()
+
+    def add_tick_job(self, name, job, interval = 1, is_active = None):
+        self.__main_script.tick_scheduler().add_job(name, job, interval, is_active)
+
+    def batch(self):
+        return self.__main_script.batch()
+
+    def defer_to_batch_end(self, callback):
+        return self.__main_script.defer_to_batch_end(callback)
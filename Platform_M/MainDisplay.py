@@ -9,13 +9,13 @@ class MainDisplay(MackieControlComponent):
     def __init__(self, main_script):
         MackieControlComponent.__init__(self, main_script)
         self.__stack_offset = 0
-        self.__last_send_messages = [[], []]
+        self.__last_send_rows = self.__unknown_rows()
 
     def destroy(self):
         """ Wrong char length: 56 not 54 """
-        upper_message = u'Ableton Live'.center(56)
+        upper_message = u'Ableton Live'.center(NUM_DISPLAY_ROW_CHARS)
         self.send_display_string(upper_message, 0, 0)
-        lower_message = u'Platform M+ is offline'.center(56)
+        lower_message = u'Platform M+ is offline'.center(NUM_DISPLAY_ROW_CHARS)
         self.send_display_string(lower_message, 1, 0)
         MackieControlComponent.destroy(self)
 
@@ -30,21 +30,26 @@ class MainDisplay(MackieControlComponent):
         self.__stack_offset = offset
 
     def send_display_string(self, display_string, display_row, cursor_offset):
+        """
+            Only sends the spans of the row that differ from what the display already shows,
+            using the cursor offset of the sysex to address them.
+        """
         """ Display rows swapped because of bug in Platform M+ firmware """
         if display_row == 1:
-            offset = cursor_offset
+            row_offset = 0
         elif display_row == 0:
-            offset = 56 + cursor_offset
+            row_offset = NUM_DISPLAY_ROW_CHARS
         else:
             assert 0
         """ Sysex messages should not contain bytes > 127 """
-        message_string = [ ord(c) for c in display_string ]
+        message_string = [ ord(c) for c in display_string[:NUM_DISPLAY_ROW_CHARS - cursor_offset] ]
         for i in range(len(message_string)):
             if message_string[i] >= 128:
                 message_string[i] = 0
 
-        if self.__last_send_messages[display_row] != message_string:
-            self.__last_send_messages[display_row] = message_string
+        row = self.__last_send_rows[display_row]
+        for first, last in self.__changed_spans(row, message_string, cursor_offset):
+            row[first:last] = message_string[first - cursor_offset:last - cursor_offset]
             if self.main_script().is_extension():
                 device_type = SYSEX_DEVICE_TYPE_XT
             else:
@@ -55,11 +60,29 @@ class MainDisplay(MackieControlComponent):
              102,
              device_type,
              18,
-             offset) + tuple(message_string) + (247,)
+             row_offset + first) + tuple(row[first:last]) + (247,)
             self.send_midi(display_sysex)
 
+    def __changed_spans(self, row, message_string, cursor_offset):
+        """
+            Returns the [first, last) character spans of the row that will change. Spans that
+            are at most DISPLAY_SYSEX_OVERHEAD characters apart are merged: resending the
+            unchanged characters in between costs no more than starting another sysex.
+        """
+        spans = []
+        for i in range(len(message_string)):
+            position = cursor_offset + i
+            if row[position] != message_string[i]:
+                if spans and position - spans[-1][1] <= DISPLAY_SYSEX_OVERHEAD:
+                    spans[-1][1] = position + 1
+                else:
+                    spans.append([position, position + 1])
+
+        return spans
+
     def refresh_state(self):
-        self.__last_send_messages = [[], []]
+        self.__last_send_rows = self.__unknown_rows()
 
-    def on_update_display_timer(self):
-        pass
+    def __unknown_rows(self):
+        """ None never equals a character, so everything gets sent again """
+        return [[None] * NUM_DISPLAY_ROW_CHARS, [None] * NUM_DISPLAY_ROW_CHARS]
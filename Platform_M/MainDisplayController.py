@@ -2,7 +2,10 @@
 from __future__ import absolute_import, print_function, unicode_literals
 from builtins import str
 from builtins import range
+from functools import partial
+from ableton.v2.base import liveobj_valid
 from .MackieControlComponent import *
+from .AbbreviationEngine import AbbreviationEngine
 
 class MainDisplayController(MackieControlComponent):
     """
@@ -16,6 +19,11 @@ class MainDisplayController(MackieControlComponent):
 
         See 'class ChannelStripController' for descriptions of the stack_index or details
         about the different assignment modes.
+
+        In channel strip mode, every strip has an upper and a lower 7 character cell. A cell
+        is only rendered again when it got dirty: because its source changed (see
+        'set_parameters', 'set_channel_strip_strings', the bank offset...), or because one
+        of the listeners to the shown track names and parameter values fired.
     """
 
     def __init__(self, main_script, display):
@@ -37,9 +45,22 @@ class MainDisplayController(MackieControlComponent):
         self.__bank_channel_offset = 0
         self.__meters_enabled = False
         self.__show_return_tracks = False
+        self.__abbreviations = AbbreviationEngine()
+        self.__window_tracks = []
+        self.__track_name_listeners = []
+        self.__parameter_value_listeners = []
+        self.__reset_cells(NUM_CHANNEL_STRIPS)
+        self.song().add_visible_tracks_listener(self.__on_window_tracks_changed)
+        self.song().add_return_tracks_listener(self.__on_window_tracks_changed)
+        self.__update_window_tracks()
+        self.add_tick_job(u'main display', self.on_update_display_timer)
 
     def destroy(self):
         self.enable_meters(False)
+        self.song().remove_visible_tracks_listener(self.__on_window_tracks_changed)
+        self.song().remove_return_tracks_listener(self.__on_window_tracks_changed)
+        self.__remove_track_name_listeners()
+        self.__remove_parameter_value_listeners()
         MackieControlComponent.destroy(self)
 
     def refresh_state(self):
@@ -69,11 +90,14 @@ class MainDisplayController(MackieControlComponent):
 
         self.__parameters = [ [] for x in range(len(self.__displays) * NUM_CHANNEL_STRIPS) ]
         self.__channel_strip_strings = [ u'' for x in range(len(self.__displays) * NUM_CHANNEL_STRIPS) ]
+        self.__reset_cells(len(self.__displays) * NUM_CHANNEL_STRIPS)
+        self.__update_window_tracks()
         self.refresh_state()
 
     def toggle_channel_strip_mode(self):
         """ Toggle Channel strip / Global mode """
         self.__channel_strip_mode = not self.__channel_strip_mode
+        self.__invalidate_cells()
 
     def toggle_time_mode(self):
         self.__time_mode = not self.__time_mode
@@ -123,77 +147,47 @@ class MainDisplayController(MackieControlComponent):
 
     def set_show_parameter_names(self, enable):
         self.__show_parameter_names = enable
+        self.__update_cell_sources()
 
     def set_channel_offset(self, channel_offset):
-        self.__bank_channel_offset = channel_offset
+        if self.__bank_channel_offset != channel_offset:
+            self.__bank_channel_offset = channel_offset
+            self.__update_window_tracks()
 
     def parameters(self):
         return self.__parameters
 
     def set_parameters(self, parameters):
         if parameters:
-            self.set_channel_strip_strings(None)
-        for d in self.__displays:
-            self.__parameters = parameters
+            self.__channel_strip_strings = None
+        self.__parameters = parameters
+        self.__update_cell_sources()
 
     def channel_strip_strings(self):
         return self.__channel_strip_strings
 
     def set_channel_strip_strings(self, channel_strip_strings):
         if channel_strip_strings:
-            self.set_parameters(None)
+            self.__parameters = None
         self.__channel_strip_strings = channel_strip_strings
+        self.__update_cell_sources()
 
     def set_show_return_track_names(self, show_returns):
-        self.__show_return_tracks = show_returns
+        if self.__show_return_tracks != show_returns:
+            self.__show_return_tracks = show_returns
+            self.__update_window_tracks()
 
     def refresh_state(self):
         for d in self.__displays:
             d.refresh_state()
 
+        self.__invalidate_cells()
+
     def on_update_display_timer(self):
         """ Called by a timer which gets called every 100 ms. """
-        strip_index = 0
         for display in self.__displays:
             if self.__channel_strip_mode:
-                upper_string = u''
-                lower_string = u''
-                track_index_range = list(range(self.__bank_channel_offset + display.stack_offset(), self.__bank_channel_offset + display.stack_offset() + NUM_CHANNEL_STRIPS))
-                if self.__show_return_tracks:
-                    tracks = self.song().return_tracks
-                else:
-                    tracks = self.song().visible_tracks
-                for t in track_index_range:
-                    if self.__parameters and self.__show_parameter_names:
-                        if self.__parameters[strip_index]:
-                            upper_string += self.__generate_6_char_string(self.__parameters[strip_index][1])
-                        else:
-                            upper_string += self.__generate_6_char_string(u'')
-                    elif t < len(tracks):
-                        upper_string += self.__generate_6_char_string(tracks[t].name)
-                    else:
-                        upper_string += self.__generate_6_char_string(u'')
-                    upper_string += u' '
-                    if self.__parameters and self.__parameters[strip_index]:
-                        if self.__parameters[strip_index][0]:
-                            lower_string += self.__generate_6_char_string(str(self.__parameters[strip_index][0]))
-                        else:
-                            lower_string += self.__generate_6_char_string(u'')
-                    elif self.__channel_strip_strings and self.__channel_strip_strings[strip_index]:
-                        lower_string += self.__generate_6_char_string(self.__channel_strip_strings[strip_index])
-                    else:
-                        lower_string += self.__generate_6_char_string(u'')
-                    lower_string += u' '
-                    strip_index += 1
-
-                """ If nothing to display show 'No Sends/Returns', if no Plug-ins or I/O show 'No Entries' """
-                if upper_string == u''.ljust(56):
-                    lower_string = u'No Sends/Returns'.center(56)
-                if lower_string == u''.ljust(56):
-                    lower_string = u'No Entries'.center(56)
-                display.send_display_string(upper_string, 0, 0)
-                if not self.__meters_enabled:
-                    display.send_display_string(lower_string, 1, 0)
+                break
             elif self.__time_mode:
                 if not self.__info_mode:
                     """ Show only the values for Time mode """
@@ -211,27 +205,137 @@ class MainDisplayController(MackieControlComponent):
                     self.toggle_info_mode()
                     self.toggle_channel_strip_mode()
 
-    def __generate_6_char_string(self, display_string):
-        if not display_string:
-            return u'      '
-        if len(display_string.strip()) > 6 and display_string.endswith(u'dB') and display_string.find(u'.') != -1:
-            display_string = display_string[:-2]
-        if len(display_string) > 6:
-            for um in [u' ',
-             u'i',
-             u'o',
-             u'u',
-             u'e',
-             u'a']:
-                while len(display_string) > 6 and display_string.rfind(um, 1) != -1:
-                    um_pos = display_string.rfind(um, 1)
-                    display_string = display_string[:um_pos] + display_string[um_pos + 1:]
+        if self.__channel_strip_mode:
+            self.__send_dirty_cells()
+
+    def __reset_cells(self, num_strips):
+        self.__remove_parameter_value_listeners()
+        self.__parameter_value_listeners = [ None for x in range(num_strips) ]
+        self.__upper_cell_sources = [ None for x in range(num_strips) ]
+        self.__lower_cell_sources = [ None for x in range(num_strips) ]
+        self.__upper_cells = [ u'' for x in range(num_strips) ]
+        self.__lower_cells = [ u'' for x in range(num_strips) ]
+        self.__invalidate_cells()
+
+    def __invalidate_cells(self):
+        self.__dirty_upper_cells = set(range(len(self.__upper_cells)))
+        self.__dirty_lower_cells = set(range(len(self.__lower_cells)))
+
+    def __upper_cell_source(self, strip_index):
+        if self.__parameters and self.__show_parameter_names:
+            if self.__parameters[strip_index]:
+                return (u'name', self.__parameters[strip_index][1])
+            return (u'name', u'')
+        return (u'track', self.__window_tracks[strip_index])
+
+    def __lower_cell_source(self, strip_index):
+        if self.__parameters and self.__parameters[strip_index]:
+            return (u'parameter', self.__parameters[strip_index][0])
+        if self.__channel_strip_strings and self.__channel_strip_strings[strip_index]:
+            return (u'name', self.__channel_strip_strings[strip_index])
+        return (u'name', u'')
+
+    def __update_cell_sources(self):
+        """ Flag the cells whose source changed, and follow the values of the shown parameters """
+        for strip_index in range(len(self.__upper_cell_sources)):
+            upper_source = self.__upper_cell_source(strip_index)
+            if upper_source != self.__upper_cell_sources[strip_index]:
+                self.__upper_cell_sources[strip_index] = upper_source
+                self.__dirty_upper_cells.add(strip_index)
+            lower_source = self.__lower_cell_source(strip_index)
+            if lower_source != self.__lower_cell_sources[strip_index]:
+                self.__lower_cell_sources[strip_index] = lower_source
+                self.__dirty_lower_cells.add(strip_index)
+                self.__remove_parameter_value_listener(strip_index)
+                if lower_source[0] == u'parameter' and lower_source[1]:
+                    listener = partial(self.__on_parameter_value_changed, strip_index)
+                    lower_source[1].add_value_listener(listener)
+                    self.__parameter_value_listeners[strip_index] = (lower_source[1], listener)
+
+    def __render_upper_cell(self, source):
+        if source[0] == u'track':
+            if source[1] != None:
+                return self.__abbreviations.abbreviate(source[1].name)
+            return self.__abbreviations.abbreviate(u'')
+        return self.__abbreviations.abbreviate(source[1])
+
+    def __render_lower_cell(self, source):
+        if source[0] == u'parameter':
+            if source[1]:
+                return self.__abbreviations.abbreviate(str(source[1]))
+            return self.__abbreviations.abbreviate(u'')
+        return self.__abbreviations.abbreviate(source[1])
+
+    def __send_dirty_cells(self):
+        """ Render the dirty cells, and send the rows of the displays they are shown on """
+        if not self.__dirty_upper_cells and not self.__dirty_lower_cells:
+            return
+        for strip_index in self.__dirty_upper_cells:
+            self.__upper_cells[strip_index] = self.__render_upper_cell(self.__upper_cell_sources[strip_index]) + u' '
 
+        for strip_index in self.__dirty_lower_cells:
+            self.__lower_cells[strip_index] = self.__render_lower_cell(self.__lower_cell_sources[strip_index]) + u' '
+
+        dirty_displays = set([ strip_index // NUM_CHANNEL_STRIPS for strip_index in self.__dirty_upper_cells | self.__dirty_lower_cells ])
+        self.__dirty_upper_cells = set()
+        self.__dirty_lower_cells = set()
+        for display_index in sorted(dirty_displays):
+            first_strip = display_index * NUM_CHANNEL_STRIPS
+            upper_string = u''.join(self.__upper_cells[first_strip:first_strip + NUM_CHANNEL_STRIPS])
+            lower_string = u''.join(self.__lower_cells[first_strip:first_strip + NUM_CHANNEL_STRIPS])
+            """ If nothing to display show 'No Sends/Returns', if no Plug-ins or I/O show 'No Entries' """
+            if upper_string == u''.ljust(56):
+                lower_string = u'No Sends/Returns'.center(56)
+            if lower_string == u''.ljust(56):
+                lower_string = u'No Entries'.center(56)
+            display = self.__displays[display_index]
+            display.send_display_string(upper_string, 0, 0)
+            if not self.__meters_enabled:
+                display.send_display_string(lower_string, 1, 0)
+
+    def __update_window_tracks(self):
+        """ Follow the names of the tracks that are currently shown in the upper row """
+        self.__remove_track_name_listeners()
+        if self.__show_return_tracks:
+            tracks = self.song().return_tracks
         else:
-            display_string = display_string.center(6)
-        ret = u''
-        for i in range(6):
-            ret += display_string[i]
+            tracks = self.song().visible_tracks
+        self.__window_tracks = []
+        for strip_index in range(len(self.__upper_cell_sources)):
+            t = self.__bank_channel_offset + strip_index
+            if t < len(tracks):
+                listener = partial(self.__on_track_name_changed, strip_index)
+                tracks[t].add_name_listener(listener)
+                self.__track_name_listeners.append((tracks[t], listener))
+                self.__window_tracks.append(tracks[t])
+            else:
+                self.__window_tracks.append(None)
+
+        self.__update_cell_sources()
+
+    def __remove_track_name_listeners(self):
+        for track, listener in self.__track_name_listeners:
+            if liveobj_valid(track) and track.name_has_listener(listener):
+                track.remove_name_listener(listener)
+
+        self.__track_name_listeners = []
+
+    def __remove_parameter_value_listener(self, strip_index):
+        if self.__parameter_value_listeners[strip_index]:
+            parameter, listener = self.__parameter_value_listeners[strip_index]
+            if liveobj_valid(parameter) and parameter.value_has_listener(listener):
+                parameter.remove_value_listener(listener)
+            self.__parameter_value_listeners[strip_index] = None
+
+    def __remove_parameter_value_listeners(self):
+        for strip_index in range(len(self.__parameter_value_listeners)):
+            self.__remove_parameter_value_listener(strip_index)
+
+    def __on_window_tracks_changed(self):
+        self.__update_window_tracks()
+
+    def __on_track_name_changed(self, strip_index):
+        self.__dirty_upper_cells.add(strip_index)
 
-        assert len(ret) == 6
-        return ret
+    def __on_parameter_value_changed(self, strip_index):
+        self.__dirty_lower_cells.add(strip_index)
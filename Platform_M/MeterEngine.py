@@ -0,0 +1,89 @@
+from __future__ import absolute_import, print_function, unicode_literals
+from .MackieControlComponent import *
+""" Marks a meter level the hardware shows that we don't know """
+UNKNOWN_METER_LEVEL = 255
+
+class MeterEngine(MackieControlComponent):
+    """
+        Drives the level meters of our channel strips (the extensions meter their own).
+
+        Every tick the level of each metering strip is read from Live, quantized to the
+        0..12 steps of the hardware, and run through peak hold and decay. A level is
+        only sent when it differs from the one the hardware shows, or to keep a non
+        zero level from falling, after METER_KEEPALIVE_TICKS. So the meter traffic
+        follows the signal, not the number of strips.
+
+        With the default peak hold and decay the meters show the current level, as
+        before.
+    """
+
+    def __init__(self, main_script, peak_hold_ticks = METER_PEAK_HOLD_TICKS, decay_per_tick = METER_DECAY_PER_TICK, keepalive_ticks = METER_KEEPALIVE_TICKS):
+        MackieControlComponent.__init__(self, main_script)
+        self.__peak_hold_ticks = peak_hold_ticks
+        self.__decay_per_tick = decay_per_tick
+        self.__keepalive_ticks = keepalive_ticks
+        self.__channel_strips = []
+        self.__levels = bytearray(NUM_CHANNEL_STRIPS)
+        self.__hold_ticks = bytearray(NUM_CHANNEL_STRIPS)
+        self.__sent_levels = bytearray([UNKNOWN_METER_LEVEL] * NUM_CHANNEL_STRIPS)
+        self.__ticks_since_sent = bytearray(NUM_CHANNEL_STRIPS)
+        self.__dropped_messages = main_script.dropped_midi_messages()
+        self.add_tick_job(u'meters', self.on_update_display_timer)
+
+    def destroy(self):
+        self.__channel_strips = []
+        MackieControlComponent.destroy(self)
+
+    def set_channel_strips(self, channel_strips):
+        self.__channel_strips = channel_strips
+
+    def invalidate(self, strip_index = None):
+        """ Forget what the meter(s) show, e.g. after the meter mode was sent """
+        if strip_index == None:
+            self.__sent_levels = bytearray([UNKNOWN_METER_LEVEL] * NUM_CHANNEL_STRIPS)
+        else:
+            self.__sent_levels[strip_index] = UNKNOWN_METER_LEVEL
+
+    def __meter_level(self, track):
+        if track.can_be_armed and track.arm:
+            return track.input_meter_level
+        return track.output_meter_level
+
+    def __held_level(self, strip_index, level):
+        """ Apply peak hold and decay to the quantized level """
+        shown_level = self.__levels[strip_index]
+        if level >= shown_level:
+            self.__hold_ticks[strip_index] = self.__peak_hold_ticks
+            return level
+        if self.__hold_ticks[strip_index] > 0:
+            self.__hold_ticks[strip_index] -= 1
+            return shown_level
+        return max(level, shown_level - self.__decay_per_tick)
+
+    def refresh_state(self):
+        self.invalidate()
+
+    def on_update_display_timer(self):
+        dropped_messages = self.main_script().dropped_midi_messages()
+        if dropped_messages != self.__dropped_messages:
+            """ Levels sent in a crowded tick might not have made it to the hardware """
+            self.__dropped_messages = dropped_messages
+            self.invalidate()
+        for s in self.__channel_strips:
+            strip_index = s.strip_index()
+            if not s.shows_meter():
+                self.__sent_levels[strip_index] = UNKNOWN_METER_LEVEL
+                continue
+            track = s.assigned_track()
+            if track:
+                level = int(self.__meter_level(track) * float(NUM_METER_LEVELS))
+            else:
+                level = 0
+            level = self.__held_level(strip_index, level)
+            self.__levels[strip_index] = level
+            ticks_since_sent = min(self.__ticks_since_sent[strip_index] + 1, 255)
+            if level != self.__sent_levels[strip_index] or level != 0 and ticks_since_sent >= self.__keepalive_ticks:
+                self.__sent_levels[strip_index] = level
+                ticks_since_sent = 0
+                self.send_midi((208, level + (strip_index << 4)))
+            self.__ticks_since_sent[strip_index] = ticks_since_sent
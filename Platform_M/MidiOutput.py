@@ -0,0 +1,93 @@
+from __future__ import absolute_import, print_function, unicode_literals
+from builtins import range
+from builtins import object
+from collections import deque
+from .consts import *
+
+class MidiOutput(object):
+    """
+        The output layer underneath 'MackieControl.send_midi'.
+
+        Keeps a shadow register of the last value sent for every note and CC, and drops
+        messages that would not change what the hardware already shows. CCs that the MIDI
+        map feedback writes behind our back (the V-Pot rings) are never shadowed, because
+        we can't know their state.
+
+        Everything else is queued by priority class (motor faders, LEDs, display sysex,
+        meters) and flushed with a byte budget per update_display tick, so that a bank
+        switch, a display rewrite and the meters landing in the same tick can't saturate
+        the link. Faders, LEDs and the display are deferred to the next tick when the
+        budget is exceeded, meters are dropped, as they are outdated by then anyway.
+    """
+
+    def __init__(self, send_midi, bytes_per_tick = MIDI_OUTPUT_BYTES_PER_TICK):
+        self.__send_midi = send_midi
+        self.__shadow = {}
+        self.__queues = [ deque() for x in range(NUM_MIDI_PRIORITIES) ]
+        self.__bytes_per_tick = bytes_per_tick
+        self.__budget = bytes_per_tick
+        self.__dropped_messages = 0
+
+    def invalidate(self):
+        """ Forget the shadowed state, to be called whenever the hardware state is unknown """
+        self.__shadow = {}
+
+    def dropped_messages(self):
+        return self.__dropped_messages
+
+    def send(self, midi_event_bytes, repeat = 1):
+        """ 'repeat' sends the message multiple times (if at all), e.g. for firmware workarounds """
+        if self.__is_shadowed(midi_event_bytes):
+            address = (midi_event_bytes[0], midi_event_bytes[1])
+            if self.__shadow.get(address) == midi_event_bytes[2]:
+                return
+            self.__shadow[address] = midi_event_bytes[2]
+        self.__queues[self.__priority(midi_event_bytes)].append((midi_event_bytes, repeat))
+
+    def start_tick(self):
+        """ Called at the beginning of every update_display tick to renew the budget """
+        self.__budget = self.__bytes_per_tick
+
+    def flush(self, force = False):
+        """ Sends as much of the queued output as the budget allows, everything if 'force' is set """
+        for priority in range(NUM_MIDI_PRIORITIES):
+            queue = self.__queues[priority]
+            while queue:
+                midi_event_bytes, repeat = queue[0]
+                if not force and not self.__fits(len(midi_event_bytes) * repeat):
+                    self.__drop_meters()
+                    return
+                queue.popleft()
+                self.__budget -= len(midi_event_bytes) * repeat
+                for i in range(repeat):
+                    self.__send_midi(midi_event_bytes)
+
+    def __drop_meters(self):
+        meters = self.__queues[MIDI_PRIORITY_METER]
+        self.__dropped_messages += len(meters)
+        meters.clear()
+
+    def __fits(self, size):
+        """ A full budget always lets one message pass, so even oversized ones can't get stuck """
+        return size <= self.__budget or self.__budget == self.__bytes_per_tick
+
+    def __priority(self, midi_event_bytes):
+        status = midi_event_bytes[0] & 240
+        if status == PB_STATUS:
+            return MIDI_PRIORITY_FADER
+        if status == 208:
+            """ Meters are sent as channel pressure """
+            return MIDI_PRIORITY_METER
+        if midi_event_bytes[0] == 240:
+            return MIDI_PRIORITY_DISPLAY
+        return MIDI_PRIORITY_LED
+
+    def __is_shadowed(self, midi_event_bytes):
+        if len(midi_event_bytes) != 3:
+            return False
+        status = midi_event_bytes[0] & 240
+        if status == NOTE_ON_STATUS:
+            return True
+        if status == CC_STATUS:
+            return midi_event_bytes[1] not in vpot_ring_cc_nos
+        return False
@@ -0,0 +1,65 @@
+from __future__ import absolute_import, print_function, unicode_literals
+from builtins import object
+from functools import partial
+from ableton.v2.base import liveobj_valid
+from .MackieControlComponent import *
+""" The track property that lists the available routing targets, per IO sub mode """
+available_routing_targets_properties = {CSM_IO_MODE_INPUT_MAIN: u'available_input_routing_types',
+ CSM_IO_MODE_INPUT_SUB: u'available_input_routing_channels',
+ CSM_IO_MODE_OUTPUT_MAIN: u'available_output_routing_types',
+ CSM_IO_MODE_OUTPUT_SUB: u'available_output_routing_channels'}
+
+class RoutingTargetCache(object):
+    """
+        Remembers the available routing targets (RoutingType- or RoutingChannel objects)
+        of a track per IO sub mode, as the ordered list of their unique display names,
+        with the position and the first target object for each name. So stepping through
+        the routings with a V-Pot doesn't need to scan the targets on every tick.
+
+        An entry is dropped as soon as the available targets of its track change.
+    """
+
+    def __init__(self):
+        self.__entries = {}
+
+    def names(self, track, sub_mode):
+        return self.__entry(track, sub_mode)[0]
+
+    def index_of(self, track, sub_mode, name):
+        """ Position of the name within 'names', or None """
+        return self.__entry(track, sub_mode)[1].get(name)
+
+    def target_by_name(self, track, sub_mode, name):
+        """ The first target whose display_name is equal to name, or None """
+        return self.__entry(track, sub_mode)[2].get(name)
+
+    def clear(self):
+        """ To be called when the tracks whose targets we are interested in changed """
+        for key in list(self.__entries.keys()):
+            self.__invalidate(key)
+
+    def __entry(self, track, sub_mode):
+        key = (liveobj_key(track), sub_mode)
+        entry = self.__entries.get(key)
+        if entry == None:
+            property = available_routing_targets_properties[sub_mode]
+            names = []
+            indices = {}
+            targets = {}
+            for target in getattr(track, property):
+                name = target.display_name
+                if name not in indices:
+                    indices[name] = len(names)
+                    names.append(name)
+                    targets[name] = target
+
+            listener = partial(self.__invalidate, key)
+            getattr(track, u'add_{}_listener'.format(property))(listener)
+            entry = (tuple(names), indices, targets, track, property, listener)
+            self.__entries[key] = entry
+        return entry
+
+    def __invalidate(self, key):
+        names, indices, targets, track, property, listener = self.__entries.pop(key)
+        if liveobj_valid(track) and getattr(track, u'{}_has_listener'.format(property))(listener):
+            getattr(track, u'remove_{}_listener'.format(property))(listener)
@@ -9,6 +9,7 @@ class SoftwareController(MackieControlComponent):
         MackieControlComponent.__init__(self, main_script)
         self.__last_can_undo_state = False
         self.__last_can_redo_state = False
+        self.add_tick_job(u'undo redo leds', self.on_update_display_timer, interval=UNDO_REDO_POLL_TICKS)
         av = self.application().view
         av.add_is_view_visible_listener(u'Session', self.__update_session_arranger_button_led)
         # av.add_is_view_visible_listener(u'Detail/Clip', self.__update_detail_sub_view_button_led)
@@ -117,11 +118,11 @@ class SoftwareController(MackieControlComponent):
         #self.__update_follow_song_button_led()
 
     def on_update_display_timer(self):
-        if self.__last_can_undo_state != self.song().can_undo:
-            self.__last_can_undo_state = self.song().can_undo
+        if self.__last_can_undo_state != self.live_snapshot().can_undo():
+            self.__last_can_undo_state = self.live_snapshot().can_undo()
             self.__update_undo_button_led()
-        if self.__last_can_redo_state != self.song().can_redo:
-            self.__last_can_redo_state = self.song().can_redo
+        if self.__last_can_redo_state != self.live_snapshot().can_redo():
+            self.__last_can_redo_state = self.live_snapshot().can_redo()
             self.__update_redo_button_led()
 
     def __toggle_session_arranger_is_visible(self):
@@ -204,13 +205,13 @@ class SoftwareController(MackieControlComponent):
             self.send_midi((NOTE_ON_STATUS, SID_AUTOMATION_TOUCH, BUTTON_STATE_OFF))
 
     def __update_undo_button_led(self):
-        if self.song().can_undo:
+        if self.live_snapshot().can_undo():
             self.send_midi((NOTE_ON_STATUS, SID_FUNC_UNDO, BUTTON_STATE_ON))
         else:
             self.send_midi((NOTE_ON_STATUS, SID_FUNC_UNDO, BUTTON_STATE_OFF))
 
     def __update_redo_button_led(self):
-        if self.song().can_redo:
+        if self.live_snapshot().can_redo():
             self.send_midi((NOTE_ON_STATUS, SID_FUNC_REDO, BUTTON_STATE_ON))
         else:
             self.send_midi((NOTE_ON_STATUS, SID_FUNC_REDO, BUTTON_STATE_OFF))
@@ -0,0 +1,43 @@
+from __future__ import absolute_import, print_function, unicode_literals
+from builtins import object
+
+class TickScheduler(object):
+    """
+        Runs the periodic jobs of the components from 'MackieControl.update_display'.
+
+        Each job is registered with the number of ticks (of 100 ms) between its runs, and
+        an optional 'is_active' predicate. While the predicate returns False, the job is
+        not invoked at all, so components that have nothing to do (no button held, no
+        clip triggered...) cost nothing per tick. Jobs run in the order they were added.
+    """
+
+    def __init__(self):
+        self.__jobs = []
+        self.__run_counts = {}
+        self.__tick = 0
+
+    def add_job(self, name, job, interval = 1, is_active = None):
+        assert name not in self.__run_counts
+        assert interval >= 1
+        self.__jobs.append((name, job, interval, is_active))
+        self.__run_counts[name] = 0
+
+    def remove_job(self, name):
+        self.__jobs = [ j for j in self.__jobs if j[0] != name ]
+        del self.__run_counts[name]
+
+    def clear(self):
+        self.__jobs = []
+        self.__run_counts = {}
+
+    def run_counts(self):
+        """ How often each job was invoked, by name """
+        return dict(self.__run_counts)
+
+    def run(self):
+        """ To be called once per tick """
+        self.__tick += 1
+        for name, job, interval, is_active in list(self.__jobs):
+            if self.__tick % interval == 0 and (is_active == None or is_active()):
+                self.__run_counts[name] += 1
+                job()
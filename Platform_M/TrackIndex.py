@@ -0,0 +1,168 @@
+from __future__ import absolute_import, print_function, unicode_literals
+from builtins import range
+from functools import partial
+from ableton.v2.base import liveobj_valid
+from .MackieControlComponent import *
+
+class TrackIndex(MackieControlComponent):
+    """
+        Maps tracks to their position in the lists the Mackie Control addresses them by,
+        so that finding a track does not need to walk all tracks of the set.
+
+        There are two of those lists:
+        - visible tracks + return tracks, what the channel strips are banked over
+        - tracks + return tracks + master track, what the bank follows the selection by
+
+        Both are only rebuilt on demand, after the song's track lists changed, or when a
+        track is not found, as the song's listeners might notify others before us.
+
+        Further it keeps the sets of soloed and armed tracks up to date from the tracks
+        solo and arm listeners, so that 'any_soloed' or exclusive solo/arm do not need to
+        look at all tracks.
+    """
+
+    def __init__(self, main_script):
+        MackieControlComponent.__init__(self, main_script)
+        self.__visible_tracks = None
+        self.__visible_track_positions = None
+        self.__all_track_positions = None
+        self.__state_listeners = {u'solo': {}, u'arm': {}}
+        self.__tracks_in_state = {u'solo': {}, u'arm': {}}
+        self.__any_soloed_listeners = []
+        self.song().add_tracks_listener(self.__on_track_lists_changed)
+        self.song().add_visible_tracks_listener(self.invalidate)
+        self.song().add_return_tracks_listener(self.__on_track_lists_changed)
+        self.__update_state_listeners()
+
+    def destroy(self):
+        self.song().remove_tracks_listener(self.__on_track_lists_changed)
+        self.song().remove_visible_tracks_listener(self.invalidate)
+        self.song().remove_return_tracks_listener(self.__on_track_lists_changed)
+        for state in self.__state_listeners:
+            self.__follow_track_state(state, {})
+
+        self.__any_soloed_listeners = []
+        MackieControlComponent.destroy(self)
+
+    def invalidate(self):
+        """
+            Also to be called by listeners to the track lists that might run before ours,
+            as Live does not guarantee an order
+        """
+        self.__visible_tracks = None
+        self.__visible_track_positions = None
+        self.__all_track_positions = None
+
+    def visible_tracks(self):
+        """ Visible tracks + return tracks """
+        if self.__visible_tracks == None:
+            self.__visible_tracks = tuple(self.song().visible_tracks) + tuple(self.song().return_tracks)
+        return self.__visible_tracks
+
+    def visible_track_position(self, track):
+        """ Position in visible tracks + return tracks, or None """
+        key = liveobj_key(track)
+        if track != None and key not in (self.__visible_track_positions or {}):
+            """ Our track list listeners might not have run yet, rebuild once """
+            self.__visible_tracks = None
+            self.__visible_track_positions = None
+        if self.__visible_track_positions == None:
+            self.__visible_track_positions = self.__positions(self.visible_tracks())
+        return self.__visible_track_positions.get(key)
+
+    def track_position(self, track):
+        """ Position in tracks + return tracks + master track, or None """
+        key = liveobj_key(track)
+        if track != None and key not in (self.__all_track_positions or {}):
+            """ Our track list listeners might not have run yet, rebuild once """
+            self.__all_track_positions = None
+        if self.__all_track_positions == None:
+            all_tracks = tuple(self.song().tracks) + tuple(self.song().return_tracks) + (self.song().master_track,)
+            self.__all_track_positions = self.__positions(all_tracks)
+        return self.__all_track_positions.get(key)
+
+    def any_soloed(self):
+        """ True if any track or return track is soloed """
+        return len(self.__tracks_in_state[u'solo']) > 0
+
+    def soloed_tracks(self):
+        """ The soloed tracks and return tracks, a copy that may outlive solo changes """
+        return tuple(self.__tracks_in_state[u'solo'].values())
+
+    def armed_tracks(self):
+        """ The armed tracks, a copy that may outlive arm changes """
+        return tuple(self.__tracks_in_state[u'arm'].values())
+
+    def add_any_soloed_listener(self, listener):
+        """ Listeners get called when 'any_soloed' flips, not on every solo change """
+        assert listener not in self.__any_soloed_listeners
+        self.__any_soloed_listeners.append(listener)
+
+    def remove_any_soloed_listener(self, listener):
+        self.__any_soloed_listeners.remove(listener)
+
+    def any_soloed_has_listener(self, listener):
+        return listener in self.__any_soloed_listeners
+
+    def __positions(self, tracks):
+        positions = {}
+        for index in range(len(tracks)):
+            positions.setdefault(liveobj_key(tracks[index]), index)
+
+        return positions
+
+    def __update_state_listeners(self):
+        """ Follow the solo/arm state of the tracks that got added, forget the removed ones """
+        any_soloed = self.any_soloed()
+        soloable_tracks = {}
+        armable_tracks = {}
+        for track in self.song().tracks:
+            soloable_tracks[liveobj_key(track)] = track
+            if track.can_be_armed:
+                armable_tracks[liveobj_key(track)] = track
+
+        for track in self.song().return_tracks:
+            soloable_tracks[liveobj_key(track)] = track
+
+        self.__follow_track_state(u'solo', soloable_tracks)
+        self.__follow_track_state(u'arm', armable_tracks)
+        self.__notify_any_soloed(any_soloed)
+
+    def __follow_track_state(self, state, tracks):
+        """ Listen to 'state' (a boolean track property) of exactly the given tracks """
+        listeners = self.__state_listeners[state]
+        tracks_in_state = self.__tracks_in_state[state]
+        for key in list(listeners.keys()):
+            if key not in tracks:
+                track, listener = listeners.pop(key)
+                if liveobj_valid(track) and getattr(track, state + u'_has_listener')(listener):
+                    getattr(track, u'remove_' + state + u'_listener')(listener)
+                tracks_in_state.pop(key, None)
+
+        for key, track in tracks.items():
+            if key not in listeners:
+                listener = partial(self.__on_track_state_changed, state, track)
+                getattr(track, u'add_' + state + u'_listener')(listener)
+                listeners[key] = (track, listener)
+                if getattr(track, state):
+                    tracks_in_state[key] = track
+
+    def __on_track_lists_changed(self):
+        self.invalidate()
+        self.__update_state_listeners()
+
+    def __on_track_state_changed(self, state, track):
+        any_soloed = self.any_soloed()
+        if getattr(track, state):
+            self.__tracks_in_state[state][liveobj_key(track)] = track
+        else:
+            self.__tracks_in_state[state].pop(liveobj_key(track), None)
+        self.__notify_any_soloed(any_soloed)
+
+    def __notify_any_soloed(self, was_any_soloed):
+        if self.any_soloed() != was_any_soloed:
+            for listener in list(self.__any_soloed_listeners):
+                listener()
+
+    def refresh_state(self):
+        self.invalidate()
@@ -0,0 +1,71 @@
+from __future__ import absolute_import, print_function, unicode_literals
+from functools import partial
+from ableton.v2.base import liveobj_valid
+from .MackieControlComponent import *
+
+class TrackSubscriptions(MackieControlComponent):
+    """
+        Shares the listeners to track properties (arm, mute, solo) between the channel
+        strips, keyed by track and property, and forwards the notifications to all
+        strips that currently subscribed.
+
+        The listener in Live is added when the first strip subscribes, but only removed
+        in 'release_unused', after a bank change is complete. So when banking by one
+        channel, the tracks that stay in the window and just move to another strip keep
+        their listeners, only the tracks entering or leaving the window cost Live calls.
+        Unsubscribing without a bank change (e.g. leaving the IO mode) is released on
+        the next tick.
+    """
+
+    def __init__(self, main_script):
+        MackieControlComponent.__init__(self, main_script)
+        self.__subscriptions = {}
+        self.__release_pending = False
+        self.add_tick_job(u'release unused track listeners', self.release_unused, is_active=self.__has_pending_release)
+
+    def destroy(self):
+        for track, property, live_listener, listeners in self.__subscriptions.values():
+            self.__remove_live_listener(track, property, live_listener)
+
+        self.__subscriptions = {}
+        MackieControlComponent.destroy(self)
+
+    def add_listener(self, track, property, listener):
+        key = (liveobj_key(track), property)
+        subscription = self.__subscriptions.get(key)
+        if subscription == None:
+            live_listener = partial(self.__on_property_changed, key)
+            getattr(track, u'add_{}_listener'.format(property))(live_listener)
+            subscription = (track, property, live_listener, [])
+            self.__subscriptions[key] = subscription
+        subscription[3].append(listener)
+
+    def remove_listener(self, track, property, listener):
+        subscription = self.__subscriptions.get((liveobj_key(track), property))
+        if subscription != None and listener in subscription[3]:
+            subscription[3].remove(listener)
+            if not subscription[3]:
+                self.__release_pending = True
+
+    def release_unused(self):
+        """ Remove the listeners in Live that no strip is subscribed to anymore """
+        self.__release_pending = False
+        for key, subscription in list(self.__subscriptions.items()):
+            track, property, live_listener, listeners = subscription
+            if not listeners:
+                del self.__subscriptions[key]
+                self.__remove_live_listener(track, property, live_listener)
+
+    def __has_pending_release(self):
+        return self.__release_pending
+
+    def __remove_live_listener(self, track, property, live_listener):
+        if liveobj_valid(track) and getattr(track, u'{}_has_listener'.format(property))(live_listener):
+            getattr(track, u'remove_{}_listener'.format(property))(live_listener)
+
+    def __on_property_changed(self, key):
+        for listener in list(self.__subscriptions[key][3]):
+            listener()
+
+    def refresh_state(self):
+        pass
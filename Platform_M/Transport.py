@@ -1,8 +1,27 @@
 #Embedded file name: /Users/versonator/Jenkins/live/output/Live/mac_64_static/Release/python-bundle/MIDI Remote Scripts/MackieControl/Transport.py
 from __future__ import absolute_import, print_function, unicode_literals
 from __future__ import division
-from past.utils import old_div
+from builtins import range
 from .MackieControlComponent import *
+try:
+    from time import monotonic as monotonic_time
+except ImportError:
+    from time import time as monotonic_time
+
+def accelerated_distance(t0, t1, acceleration = TRANSPORT_ACCELERATION):
+    """
+        The integral of max(1, acceleration * t) from t0 to t1, which is the part of the
+        fast forward/rewind distance that grows the longer the button is held
+    """
+
+    def cumulative(t):
+        knee = 1.0 / acceleration
+        if t <= knee:
+            return t
+        return (acceleration * t * t + knee) / 2.0
+
+    return cumulative(t1) - cumulative(t0)
+
 
 class Transport(MackieControlComponent):
     """ Representing the transport section of the Mackie Control """
@@ -17,10 +36,11 @@ class Transport(MackieControlComponent):
         self.__cursor_right_is_down = False
         self.__cursor_up_is_down = False
         self.__cursor_down_is_down = False
-        self.__cursor_repeat_delay = 0
-        self.__transport_repeat_delay = 0
-        self.__fast_forward_counter = 0
-        self.__fast_rewind_counter = 0
+        self.__cursor_repeat_start = 0.0
+        self.__cursor_repeats = 0
+        self.__transport_repeat_start = 0.0
+        self.__transport_repeat_time = 0.0
+        self.__transport_distance = 0.0
         self.__jog_step_count_forward = 0
         self.__jog_step_count_backwards = 0
         self.__last_focussed_clip_play_state = CLIP_STATE_INVALID
@@ -28,6 +48,10 @@ class Transport(MackieControlComponent):
         self.__zoom_blink_timer = 0
         self.__zoom_blink_state = False
         self.__last_zoom_blink_state = False
+        self.__session_is_visible = self.session_is_visible()
+        self.add_tick_job(u'fast forward rewind', self.__repeat_fast_forward_rewind, is_active=self.__fast_forward_or_rewind_is_down)
+        self.add_tick_job(u'cursor repeat', self.__repeat_cursor, is_active=self.__cursor_is_down)
+        self.add_tick_job(u'zoom blink', self.__blink_zoom_led, is_active=lambda : self.__session_is_visible)
         self.song().add_record_mode_listener(self.__update_record_button_led)
         self.song().add_is_playing_listener(self.__update_play_button_led)
         self.song().add_loop_listener(self.__update_loop_button_led)
@@ -74,10 +98,11 @@ class Transport(MackieControlComponent):
         self.__cursor_right_is_down = False
         self.__cursor_up_is_down = False
         self.__cursor_down_is_down = False
-        self.__cursor_repeat_delay = 0
-        self.__transport_repeat_delay = 0
-        self.__fast_forward_counter = 0
-        self.__fast_rewind_counter = 0
+        self.__cursor_repeat_start = 0.0
+        self.__cursor_repeats = 0
+        self.__transport_repeat_start = 0.0
+        self.__transport_repeat_time = 0.0
+        self.__transport_distance = 0.0
         self.__jog_step_count_forward = 0
         self.__jog_step_count_backwards = 0
         self.__last_focussed_clip_play_state = CLIP_STATE_INVALID
@@ -89,32 +114,61 @@ class Transport(MackieControlComponent):
     def selected_clip_slot(self):
         return self.song().view.highlighted_clip_slot
 
-    def on_update_display_timer(self):
-        if self.__transport_repeat_delay > 2:
+    def __fast_forward_or_rewind_is_down(self):
+        return self.__forward_button_down or self.__rewind_button_down
+
+    def __cursor_is_down(self):
+        return self.__cursor_left_is_down or self.__cursor_right_is_down or self.__cursor_up_is_down or self.__cursor_down_is_down
+
+    def __restart_transport_repeat(self):
+        self.__transport_repeat_start = monotonic_time() + KEY_REPEAT_DELAY
+        self.__transport_repeat_time = self.__transport_repeat_start
+        self.__transport_distance = 0.0
+
+    def __repeat_fast_forward_rewind(self):
+        """
+            The distance is computed from the time that passed since the last tick, so a
+            late tick jumps once, but as far as the missed ticks would have. Fractions of
+            a beat are carried over to the next tick.
+        """
+        now = monotonic_time()
+        if now < self.__transport_repeat_start:
+            return
+        t0 = self.__transport_repeat_time - self.__transport_repeat_start
+        t1 = now - self.__transport_repeat_start
+        self.__transport_repeat_time = now
+        if not (self.__forward_button_down and self.__rewind_button_down):
             if self.shift_is_pressed(): #Before: alt
                 base_acceleration = 1
             else:
                 base_acceleration = self.song().signature_numerator
-            if self.song().is_playing:
+            if self.live_snapshot().is_playing():
                 base_acceleration *= 4
-            if not (self.__forward_button_down and self.__rewind_button_down):
+            distance = base_acceleration * (t1 - t0)
+            if not self.shift_is_pressed(): #Before: alt
+                distance += accelerated_distance(t0, t1)
+            self.__transport_distance += distance * TRANSPORT_JUMP_RATE
+            beats = int(self.__transport_distance)
+            if beats > 0:
+                self.__transport_distance -= beats
                 if self.__forward_button_down:
-                    self.__fast_forward_counter += 1
-                    self.__fast_rewind_counter -= 4
-                    if not self.shift_is_pressed(): #Before: alt
-                        self.__fast_forward(base_acceleration + max(1, old_div(self.__fast_forward_counter, 4)))
-                    else:
-                        self.__fast_forward(base_acceleration)
-                if self.__rewind_button_down:
-                    self.__fast_rewind_counter += 1
-                    self.__fast_forward_counter -= 4
-                    if not self.shift_is_pressed(): #Before: alt
-                        self.__rewind(base_acceleration + max(1, old_div(self.__fast_rewind_counter, 4)))
-                    else:
-                        self.__rewind(base_acceleration)
-        else:
-            self.__transport_repeat_delay += 1
-        if self.__cursor_repeat_delay > 2:
+                    self.__fast_forward(beats)
+                else:
+                    self.__rewind(beats)
+
+    def __restart_cursor_repeat(self):
+        self.__cursor_repeat_start = monotonic_time() + KEY_REPEAT_DELAY
+        self.__cursor_repeats = 0
+
+    def __repeat_cursor(self):
+        """ Repeats at CURSOR_REPEAT_RATE, a late tick catches up on CURSOR_MAX_REPEATS_PER_TICK at most """
+        now = monotonic_time()
+        if now < self.__cursor_repeat_start:
+            return
+        due_repeats = int((now - self.__cursor_repeat_start) * CURSOR_REPEAT_RATE) + 1
+        repeats = min(due_repeats - self.__cursor_repeats, CURSOR_MAX_REPEATS_PER_TICK)
+        self.__cursor_repeats = due_repeats
+        for i in range(repeats):
             if self.__cursor_left_is_down:
                 self.__on_cursor_left_pressed()
             if self.__cursor_right_is_down:
@@ -123,15 +177,14 @@ class Transport(MackieControlComponent):
                 self.__on_cursor_up_pressed()
             if self.__cursor_down_is_down:
                 self.__on_cursor_down_pressed()
-        else:
-            self.__cursor_repeat_delay += 1
-        if self.session_is_visible():
-            """ Timer for Zoom LED blinking """
-            self.__zoom_blink_timer += 1
-            if self.__zoom_blink_timer == 2:
-                self.__zoom_blink_timer = 0
-                self.__zoom_blink_state = not self.__zoom_blink_state
-            self.__update_zoom_led_in_session()
+
+    def __blink_zoom_led(self):
+        """ Timer for Zoom LED blinking """
+        self.__zoom_blink_timer += 1
+        if self.__zoom_blink_timer == 2:
+            self.__zoom_blink_timer = 0
+            self.__zoom_blink_state = not self.__zoom_blink_state
+        self.__update_zoom_led_in_session()
 
     def handle_marker_switch_ids(self, switch_id, value):
         if switch_id == SID_MARKER_FROM_PREV:
@@ -180,7 +233,6 @@ class Transport(MackieControlComponent):
                 self.__rewind_button_down = True
             elif value == BUTTON_RELEASED:
                 self.__rewind_button_down = False
-                self.__fast_rewind_counter = 0
             self.__update_forward_rewind_leds()
         elif switch_id == SID_TRANSPORT_FAST_FORWARD:
             if value == BUTTON_PRESSED:
@@ -188,7 +240,6 @@ class Transport(MackieControlComponent):
                 self.__forward_button_down = True
             elif value == BUTTON_RELEASED:
                 self.__forward_button_down = False
-                self.__fast_forward_counter = 0
             self.__update_forward_rewind_leds()
         elif switch_id == SID_TRANSPORT_STOP:
             if value == BUTTON_PRESSED:
@@ -238,7 +289,7 @@ class Transport(MackieControlComponent):
                 step = max(1.0, (value - 64) / 2.0)
             else:
                 step = max(1.0, value / 2.0)
-            if self.song().is_playing:
+            if self.live_snapshot().is_playing():
                 step *= 4.0
             if self.shift_is_pressed(): #Before: Alt
                 step /= 4.0
@@ -256,28 +307,28 @@ class Transport(MackieControlComponent):
         if switch_id == SID_JOG_CURSOR_UP:
             if value == BUTTON_PRESSED:
                 self.__cursor_up_is_down = True
-                self.__cursor_repeat_delay = 0
+                self.__restart_cursor_repeat()
                 self.__on_cursor_up_pressed()
             elif value == BUTTON_RELEASED:
                 self.__cursor_up_is_down = False
         elif switch_id == SID_JOG_CURSOR_DOWN:
             if value == BUTTON_PRESSED:
                 self.__cursor_down_is_down = True
-                self.__cursor_repeat_delay = 0
+                self.__restart_cursor_repeat()
                 self.__on_cursor_down_pressed()
             elif value == BUTTON_RELEASED:
                 self.__cursor_down_is_down = False
         elif switch_id == SID_JOG_CURSOR_LEFT:
             if value == BUTTON_PRESSED:
                 self.__cursor_left_is_down = True
-                self.__cursor_repeat_delay = 0
+                self.__restart_cursor_repeat()
                 self.__on_cursor_left_pressed()
             elif value == BUTTON_RELEASED:
                 self.__cursor_left_is_down = False
         elif switch_id == SID_JOG_CURSOR_RIGHT:
             if value == BUTTON_PRESSED:
                 self.__cursor_right_is_down = True
-                self.__cursor_repeat_delay = 0
+                self.__restart_cursor_repeat()
                 self.__on_cursor_right_pressed()
             elif value == BUTTON_RELEASED:
                 self.__cursor_right_is_down = False
@@ -344,7 +395,7 @@ class Transport(MackieControlComponent):
 
     def __start_song(self):
         if self.master_is_pressed():
-            if not self.song().is_playing:
+            if not self.live_snapshot().is_playing():
                 self.song().continue_playing()
             else:
                 self.song().stop_playing()
@@ -385,7 +436,8 @@ class Transport(MackieControlComponent):
         self.song().current_song_time = self.song().last_event_time
 
     def __on_session_is_visible_changed(self):
-        if self.session_is_visible():
+        self.__session_is_visible = self.session_is_visible()
+        if self.__session_is_visible:
             self.__update_zoom_led()
         else:
             self.__update_zoom_button_led()
@@ -399,13 +451,11 @@ class Transport(MackieControlComponent):
                     if self.__zoom_blink_state != self.__last_zoom_blink_state:
                         self.__last_zoom_blink_state = self.__zoom_blink_state
                         if self.__zoom_blink_state:
-                            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_ON))
                             """ Bug in Platform M+ firmware """
-                            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_ON))
+                            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_ON), repeat=2)
                         else:
-                            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_OFF))
                             """ Bug in Platform M+ firmware """
-                            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_OFF))
+                            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_OFF), repeat=2)
                 elif clip_slot.clip.is_playing:
                     state = CLIP_PLAYING
                 else:
@@ -419,35 +469,31 @@ class Transport(MackieControlComponent):
     def __update_zoom_led(self):
         state = self.__last_focussed_clip_play_state
         if state == CLIP_PLAYING:
-            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_ON))
             """ Bug in Platform M+ firmware """
-            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_ON))
+            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_ON), repeat=2)
         #elif state == CLIP_TRIGGERED:
             #self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_BLINKING))
         else:
-            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_OFF))
             """ Bug in Platform M+ firmware """
-            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_OFF))
+            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_OFF), repeat=2)
 
     def __update_zoom_button_led(self):
         if self.__zoom_button_down:
-            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_ON))
             """ Bug in Platform M+ firmware """
-            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_ON))
+            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_ON), repeat=2)
         else:
-            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_OFF))
             """ Bug in Platform M+ firmware """
-            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_OFF))
+            self.send_midi((NOTE_ON_STATUS, SID_JOG_ZOOM, BUTTON_STATE_OFF), repeat=2)
 
     def __update_forward_rewind_leds(self):
         if self.__forward_button_down:
             self.send_midi((NOTE_ON_STATUS, SID_TRANSPORT_FAST_FORWARD, BUTTON_STATE_ON))
-            self.__transport_repeat_delay = 0
+            self.__restart_transport_repeat()
         else:
             self.send_midi((NOTE_ON_STATUS, SID_TRANSPORT_FAST_FORWARD, BUTTON_STATE_OFF))
         if self.__rewind_button_down:
             self.send_midi((NOTE_ON_STATUS, SID_TRANSPORT_REWIND, BUTTON_STATE_ON))
-            self.__transport_repeat_delay = 0
+            self.__restart_transport_repeat()
         else:
             self.send_midi((NOTE_ON_STATUS, SID_TRANSPORT_REWIND, BUTTON_STATE_OFF))
 
@@ -473,23 +519,19 @@ class Transport(MackieControlComponent):
 
     def __update_prev_cue_button_led(self):
         if self.song().can_jump_to_prev_cue:
-            self.send_midi((NOTE_ON_STATUS, SID_MARKER_FROM_PREV, BUTTON_STATE_ON))
             """ Firmware Bug in Platform M+, only recognized if send two times """
-            self.send_midi((NOTE_ON_STATUS, SID_MARKER_FROM_PREV, BUTTON_STATE_ON))
+            self.send_midi((NOTE_ON_STATUS, SID_MARKER_FROM_PREV, BUTTON_STATE_ON), repeat=2)
         else:
-            self.send_midi((NOTE_ON_STATUS, SID_MARKER_FROM_PREV, BUTTON_STATE_OFF))
             """ Firmware Bug in Platform M+, only recognized if send two times """
-            self.send_midi((NOTE_ON_STATUS, SID_MARKER_FROM_PREV, BUTTON_STATE_OFF))
+            self.send_midi((NOTE_ON_STATUS, SID_MARKER_FROM_PREV, BUTTON_STATE_OFF), repeat=2)
 
     def __update_next_cue_button_led(self):
         if self.song().can_jump_to_next_cue:
-            self.send_midi((NOTE_ON_STATUS, SID_MARKER_FROM_NEXT, BUTTON_STATE_ON))
             """ Firmware Bug in Platform M+, only recognized if send two times """
-            self.send_midi((NOTE_ON_STATUS, SID_MARKER_FROM_NEXT, BUTTON_STATE_ON))
+            self.send_midi((NOTE_ON_STATUS, SID_MARKER_FROM_NEXT, BUTTON_STATE_ON), repeat=2)
         else:
-            self.send_midi((NOTE_ON_STATUS, SID_MARKER_FROM_NEXT, BUTTON_STATE_OFF))
             """ Firmware Bug in Platform M+, only recognized if send two times """
-            self.send_midi((NOTE_ON_STATUS, SID_MARKER_FROM_NEXT, BUTTON_STATE_OFF))
+            self.send_midi((NOTE_ON_STATUS, SID_MARKER_FROM_NEXT, BUTTON_STATE_OFF), repeat=2)
 
     def __update_loop_button_led(self):
         if self.song().loop:
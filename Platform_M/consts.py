@@ -7,6 +7,38 @@ CC_STATUS = 176
 PB_STATUS = 224
 SYSEX_DEVICE_TYPE = 20
 SYSEX_DEVICE_TYPE_XT = 21
+NUM_DISPLAY_ROW_CHARS = 56
+""" Bytes of a display sysex besides the characters: header, cursor offset and EOX """
+DISPLAY_SYSEX_OVERHEAD = 8
+""" Names and values whose 6 character abbreviation is remembered """
+ABBREVIATION_CACHE_SIZE = 512
+""" Devices (and device classes) whose parameter bank layout is remembered """
+DEVICE_PARAMETER_INDEX_CACHE_SIZE = 16
+""" Priority classes of the MIDI output, the lower the more important """
+MIDI_PRIORITY_FADER = 0
+MIDI_PRIORITY_LED = 1
+MIDI_PRIORITY_DISPLAY = 2
+MIDI_PRIORITY_METER = 3
+NUM_MIDI_PRIORITIES = 4
+""" Bytes that may be sent to the hardware per update_display tick (100 ms) """
+MIDI_OUTPUT_BYTES_PER_TICK = 512
+""" Meter levels are sent as 0..12, the hardware lets a meter fall when not refreshed """
+NUM_METER_LEVELS = 12
+""" Ticks a peak stays before it decays, and levels it falls per tick then """
+METER_PEAK_HOLD_TICKS = 0
+METER_DECAY_PER_TICK = NUM_METER_LEVELS
+""" Ticks after which a level that did not change gets sent again """
+METER_KEEPALIVE_TICKS = 2
+""" Seconds a fast forward/rewind or cursor key has to be held before it repeats """
+KEY_REPEAT_DELAY = 0.3
+""" Cursor repeats per second while held, and the most that one (late) tick may catch up on """
+CURSOR_REPEAT_RATE = 10.0
+CURSOR_MAX_REPEATS_PER_TICK = 2
+""" Fast forward/rewind moves by (base + max(1, TRANSPORT_ACCELERATION * seconds repeating)) beats, TRANSPORT_JUMP_RATE times a second """
+TRANSPORT_JUMP_RATE = 10.0
+TRANSPORT_ACCELERATION = 2.5
+""" Ticks between polling can_undo/can_redo, which have no listener """
+UNDO_REDO_POLL_TICKS = 2
 NUM_CHANNEL_STRIPS = 8
 MASTER_CHANNEL_STRIP_INDEX = 8
 BUTTON_STATE_OFF = 0
@@ -19,10 +51,15 @@ SELECT_BEATS_NOTE = 114
 SELECT_RUDE_SOLO = 115
 FID_PANNING_BASE = 16
 JOG_WHEEL_CC_NO = 60
+""" CCs of the V-Pot LED rings, these are also written by the feedback of the MIDI map """
+VPOT_RING_CC_BASE = 48
+vpot_ring_cc_nos = list(range(VPOT_RING_CC_BASE, VPOT_RING_CC_BASE + 8))
 VPOT_DISPLAY_SINGLE_DOT = 0
 VPOT_DISPLAY_BOOST_CUT = 1
 VPOT_DISPLAY_WRAP = 2
 VPOT_DISPLAY_SPREAD = 3
+""" The cc_value_map of the V-Pot ring feedback rule, indexed by display mode """
+vpot_ring_cc_value_maps = tuple([ tuple([ mode * 16 + x for x in range(1, 7 if mode == VPOT_DISPLAY_SPREAD else 12) ]) for mode in range(VPOT_DISPLAY_SPREAD + 1) ])
 CSM_VOLPAN = 0
 CSM_PLUGINS = 1
 CSM_IO = 2
@@ -219,3 +256,28 @@ SID_FADER_TOUCH_SENSE_CH8 = 111
 SID_FADER_TOUCH_SENSE_MASTER = 112
 fader_touch_switch_ids = list(range(SID_FADER_TOUCH_SENSE_CH1, SID_FADER_TOUCH_SENSE_MASTER + 1))
 SID_LAST = 112
+""" Notes the MIDI map forwards to the script """
+forwarded_note_ids = tuple([ i for i in range(SID_FIRST, SID_LAST + 1) if i not in function_key_control_switch_ids ])
+""" Virtual switch ids, there is no such switch, they are only reached through the keymap """
+SID_MASTER_CUE_VOLUME = 133
+SID_SHOW_ASSIGNMENT_MODE = 134
+""" Modifier flags, combined into the modifier state the keymap is looked up with """
+MOD_MASTER = 1
+MOD_SHIFT = 2
+MOD_CTRL = 4
+MOD_ALT = 8
+NUM_MODIFIER_STATES = 16
+""" Functions of the switches that belong to a channel strip """
+CSF_RECORD_ARM = 0
+CSF_SOLO = 1
+CSF_MUTE = 2
+CSF_SELECT = 3
+CSF_VPOD_PUSH = 4
+CSF_FADER_TOUCH = 5
+""" (function, strip_index) of every channel strip switch id, to address the owning strip directly """
+channel_strip_switch_address = dict(((base + strip_index, (function, strip_index)) for function, base in ((CSF_RECORD_ARM, SID_RECORD_ARM_BASE),
+ (CSF_SOLO, SID_SOLO_BASE),
+ (CSF_MUTE, SID_MUTE_BASE),
+ (CSF_SELECT, SID_SELECT_BASE),
+ (CSF_VPOD_PUSH, SID_VPOD_PUSH_BASE),
+ (CSF_FADER_TOUCH, SID_FADER_TOUCH_SENSE_BASE)) for strip_index in range(NUM_CHANNEL_STRIPS)))
@@ -0,0 +1,73 @@
+from __future__ import absolute_import, print_function, unicode_literals
+from builtins import range
+from .consts import *
+"""
+    Remapping of the switches while a modifier is held, one layer per modifier. A layer maps
+    the switch id that was pressed to the switch id that gets dispatched instead. Rebind a
+    layer here, the dispatching in 'MackieControl.receive_midi' picks it up unchanged.
+"""
+MASTER_LAYER = {SID_SELECT_CH1: SID_FUNC_METRONOME,
+ SID_SELECT_CH2: SID_FUNC_FOLLOW_SONG,
+ SID_SELECT_CH3: SID_FUNC_ENTER,
+ SID_SELECT_CH4: SID_MOD_SHIFT,
+ SID_SELECT_CH5: SID_MOD_CTRL,
+ SID_SELECT_CH6: SID_MOD_ALT,
+ SID_SELECT_CH7: SID_FUNC_REDO,
+ SID_SELECT_CH8: SID_FUNC_UNDO,
+ SID_VPOD_PUSH_CH1: SID_ASSIGNMENT_IO,
+ SID_VPOD_PUSH_CH2: SID_ASSIGNMENT_SENDS,
+ SID_VPOD_PUSH_CH3: SID_ASSIGNMENT_PAN,
+ SID_VPOD_PUSH_CH4: SID_ASSIGNMENT_PLUG_INS,
+ SID_VPOD_PUSH_CH5: SID_ASSIGNMENT_EQ,
+ SID_VPOD_PUSH_CH6: SID_ASSIGNMENT_DYNAMIC,
+ SID_VPOD_PUSH_CH7: SID_FADERBANK_EDIT,
+ SID_VPOD_PUSH_CH8: SID_DISPLAY_TIME,
+ SID_FADER_TOUCH_SENSE_MASTER: SID_MASTER_CUE_VOLUME,
+ SID_FADERBANK_PREV_BANK: SID_MARKER_LOOP_START,
+ SID_FADERBANK_NEXT_BANK: SID_MARKER_LOOP_END,
+ SID_FADERBANK_PREV_CH: SID_MARKER_PI,
+ SID_FADERBANK_NEXT_CH: SID_MARKER_PO,
+ SID_JOG_ZOOM: SID_FUNC_MIXER,
+ SID_TRANSPORT_STOP: SID_SHOW_ASSIGNMENT_MODE}
+SHIFT_LAYER = {}
+CTRL_LAYER = {}
+ALT_LAYER = {}
+""" (modifier flag, layer) in order of precedence: the first held modifier that remaps a switch wins """
+KEYMAP_LAYERS = ((MOD_MASTER, MASTER_LAYER),
+ (MOD_SHIFT, SHIFT_LAYER),
+ (MOD_CTRL, CTRL_LAYER),
+ (MOD_ALT, ALT_LAYER))
+modifier_switch_ids = (SID_MOD_SHIFT, SID_MOD_CTRL, SID_MOD_ALT)
+
+def compile_keymap(layers = KEYMAP_LAYERS):
+    """
+        Compiles the layers into one flat table per modifier state (any combination of the
+        MOD_* flags), so that remapping a note is a single indexed read:
+        keymap[modifier_state][note] is the switch id to dispatch
+    """
+    keymap = []
+    for modifier_state in range(NUM_MODIFIER_STATES):
+        table = list(range(128))
+        for modifier, layer in reversed(layers):
+            if modifier_state & modifier:
+                for switch_id, target in layer.items():
+                    table[switch_id] = target
+
+        keymap.append(tuple(table))
+
+    return tuple(keymap)
+
+
+def emulated_modifiers(layers = KEYMAP_LAYERS):
+    """
+        Returns {switch_id: (modifier flag, modifier switch id)} for all switches that a layer
+        turns into Shift, Ctrl or Alt. Releasing such a switch after its layer's modifier was
+        released already has to release the emulated modifier too.
+    """
+    result = {}
+    for modifier, layer in layers:
+        for switch_id, target in layer.items():
+            if target in modifier_switch_ids and switch_id not in result:
+                result[switch_id] = (modifier, target)
+
+    return result
@@ -0,0 +1,58 @@
+"""
+Micro-benchmark of the 6 character abbreviation: the uncached algorithm the
+MainDisplayController used before against the AbbreviationEngine, over the
+corpus of the tests. 'refresh' passes shorten the same 8 strip names again and
+again, the way the displays are refreshed.
+
+    python benchmarks/bench_abbreviation.py
+"""
+import os
+import sys
+import timeit
+
+TESTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), u'tests')
+sys.path[:0] = [TESTS_DIR, os.path.dirname(TESTS_DIR)]
+
+import standins
+standins.install()
+
+from Platform_M.AbbreviationEngine import AbbreviationEngine
+from test_abbreviation import legacy_generate_6_char_string
+import corpus
+
+REPEAT = 5
+REFRESH_PASSES = 1000
+
+def run_corpus(abbreviate, display_strings):
+    for display_string in display_strings:
+        abbreviate(display_string)
+
+
+def run_refresh(abbreviate, display_strings):
+    strip_names = display_strings[:8]
+    for _ in range(REFRESH_PASSES):
+        for display_string in strip_names:
+            abbreviate(display_string)
+
+
+def best_of(statement):
+    return min(timeit.repeat(statement, number=1, repeat=REPEAT))
+
+
+def main():
+    display_strings = corpus.display_strings()
+    print(u'%d display strings, %d unique' % (len(display_strings), len(set(display_strings))))
+    for name, run in ((u'corpus', run_corpus), (u'refresh', run_refresh)):
+        legacy = best_of(lambda : run(legacy_generate_6_char_string, display_strings))
+        cold = best_of(lambda : run(AbbreviationEngine().abbreviate, display_strings))
+        engine = AbbreviationEngine()
+        run(engine.abbreviate, display_strings)
+        warm = best_of(lambda : run(engine.abbreviate, display_strings))
+        print(u'%-8s legacy %8.2f ms   engine cold %8.2f ms   engine warm %8.2f ms' % (name,
+         legacy * 1000.0,
+         cold * 1000.0,
+         warm * 1000.0))
+
+
+if __name__ == u'__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark of exclusive arm and solo on a 500 track template: pressing a record
+arm or solo button of a strip through 'receive_midi', against the loop over all
+tracks the ChannelStrip did before the TrackIndex kept the armed and soloed
+tracks. Also counts the track property reads that went to Live.
+
+    python benchmarks/bench_exclusive_arm_solo.py
+"""
+import os
+import sys
+import timeit
+from itertools import chain
+
+TESTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), u'tests')
+sys.path[:0] = [TESTS_DIR, os.path.dirname(TESTS_DIR)]
+
+import standins
+standins.install()
+
+from Platform_M.consts import *
+
+NUM_TRACKS = 500
+NUM_RETURNS = 12
+PRESSES = 200
+REPEAT = 5
+
+def legacy_toggle(song, track, state, exclusive):
+    """ '__toggle_arm_track' / '__toggle_solo_track' before the TrackIndex """
+    setattr(track, state, not getattr(track, state))
+    if exclusive:
+        tracks = song.tracks if state == u'arm' else chain(song.tracks, song.return_tracks)
+        for t in tracks:
+            if t != track:
+                setattr(t, state, False)
+
+
+def track_reads(song):
+    return sum((t.reads for t in chain(song.tracks, song.return_tracks)))
+
+
+def bench(name, press, song):
+    reads = track_reads(song)
+    seconds = min(timeit.repeat(press, number=PRESSES, repeat=REPEAT))
+    reads = (track_reads(song) - reads) / float(PRESSES * REPEAT)
+    print(u'%-14s %8.1f us per press   %8.1f track reads per press' % (name, seconds * 1e6 / PRESSES, reads))
+
+
+def main():
+    song = standins.make_song(num_tracks=NUM_TRACKS, num_returns=NUM_RETURNS)
+    script = standins.make_script(song)
+    song.exclusive_arm = True
+    song.exclusive_solo = True
+    print(u'%d tracks, %d return tracks' % (NUM_TRACKS, NUM_RETURNS))
+    for state, base in ((u'arm', SID_RECORD_ARM_BASE), (u'solo', SID_SOLO_BASE)):
+        strip_tracks = script.track_index().visible_tracks()[:NUM_CHANNEL_STRIPS]
+        presses = [0]
+
+        def press_strip():
+            presses[0] += 1
+            switch_id = base + presses[0] % NUM_CHANNEL_STRIPS
+            script.receive_midi((NOTE_ON_STATUS, switch_id, 127))
+            script.receive_midi((NOTE_ON_STATUS, switch_id, 0))
+
+        def press_legacy():
+            presses[0] += 1
+            legacy_toggle(song, strip_tracks[presses[0] % NUM_CHANNEL_STRIPS], state, True)
+
+        bench(u'%s index' % state, press_strip, song)
+        bench(u'%s legacy' % state, press_legacy, song)
+
+
+if __name__ == u'__main__':
+    main()
@@ -0,0 +1,32 @@
+"""
+Reproducible display strings like the ones the script shortens for the channel
+strip displays: track and device names, parameter names and values.
+"""
+import random
+
+WORDS = (u'Audio', u'MIDI', u'Drums', u'Kick', u'Snare', u'Hi Hat', u'Bass', u'Lead', u'Pad',
+ u'Vocals', u'Piano', u'Strings', u'Return', u'Reverb', u'Delay', u'Compressor', u'EQ Eight',
+ u'Glue', u'Operator', u'Simpler', u'Sampler', u'Wavetable', u'Filter', u'Freq', u'Resonance',
+ u'Dry/Wet', u'Attack', u'Release', u'Threshold', u'Ratio', u'Gain', u'Feedback', u'Übergang',
+ u'Chorus', u'Group', u'Master', u'Sidechain', u'Envelope', u'Osc', u'LFO')
+UNITS = (u' dB', u'dB', u' Hz', u' kHz', u' ms', u' %', u'', u' C', u' st')
+
+
+def display_strings(count = 10000, seed = 6):
+    generator = random.Random(seed)
+    result = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            name = u' '.join(generator.sample(WORDS, generator.randint(1, 3)))
+            if generator.random() < 0.5:
+                name += u' %d' % generator.randint(1, 128)
+        elif kind == 1:
+            name = generator.choice(WORDS)[:generator.randint(0, 8)]
+        elif kind == 2:
+            name = u'%.*f%s' % (generator.randint(0, 2), generator.uniform(-70.0, 20000.0), generator.choice(UNITS))
+        else:
+            name = u''.join(generator.choice(u'aeiou xyzAEIOU.-_1') for _ in range(generator.randint(0, 24)))
+        result.append(name)
+
+    return result
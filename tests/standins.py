@@ -0,0 +1,268 @@
+"""
+Stand-ins for the modules that only exist inside Live ('Live', '_Framework',
+'_Generic', 'ableton') and for a Song with tracks, so that the script can be
+driven from plain Python. Only used by the tests and benchmarks.
+"""
+import importlib
+import sys
+import types
+
+ROUTINGS_PER_TRACK = 4
+_live_reads = [0]
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+class _FeedbackRule(object):
+    pass
+
+
+class _MidiMap(object):
+
+    class MapMode(object):
+        absolute = 0
+        relative_signed_bit = 1
+
+    PitchBendFeedbackRule = _FeedbackRule
+    CCFeedbackRule = _FeedbackRule
+
+    @staticmethod
+    def forward_midi_note(handle, midi_map_handle, channel, note):
+        pass
+
+    @staticmethod
+    def forward_midi_cc(handle, midi_map_handle, channel, cc):
+        pass
+
+    @staticmethod
+    def forward_midi_pitchbend(handle, midi_map_handle, channel):
+        pass
+
+    @staticmethod
+    def map_midi_pitchbend_with_feedback_map(midi_map_handle, parameter, channel, rule, takeover):
+        pass
+
+    @staticmethod
+    def map_midi_cc_with_feedback_map(midi_map_handle, parameter, channel, cc, mode, rule, takeover):
+        pass
+
+    @staticmethod
+    def send_feedback_for_parameter(midi_map_handle, parameter):
+        pass
+
+
+class _Song(object):
+
+    class TimeFormat(object):
+        smpte_25 = 3
+
+
+class _Application(object):
+    current = None
+
+    @staticmethod
+    def get_application():
+        return _Application.current
+
+    class Application(object):
+
+        class View(object):
+
+            class NavDirection(object):
+                up, down, left, right = range(4)
+
+
+def _old_div(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        return a // b
+    return a / b
+
+
+def _liveobj_valid(obj):
+    return obj is not None
+
+
+def _get_parameter_by_name(device, name):
+    for parameter in device.parameters:
+        if parameter.original_name == name:
+            return parameter
+
+
+def _importable(name):
+    try:
+        importlib.import_module(name)
+        return True
+    except ImportError:
+        return False
+
+
+def install():
+    """ Registers the stand-in modules that can not be imported from the real thing """
+    modules = {
+        u'Live': _module(u'Live', MidiMap=_MidiMap, Song=_Song, Application=_Application),
+        u'MidiRemoteScript': _module(u'MidiRemoteScript'),
+        u'_Framework': _module(u'_Framework', __path__=[]),
+        u'_Framework.Capabilities': _module(u'_Framework.Capabilities',
+            CONTROLLER_ID_KEY=u'c', PORTS_KEY=u'p', SCRIPT=u's', REMOTE=u'r',
+            controller_id=lambda **k: k, inport=lambda **k: k, outport=lambda **k: k),
+        u'_Generic': _module(u'_Generic', __path__=[]),
+        u'_Generic.Devices': _module(u'_Generic.Devices',
+            DEVICE_DICT={}, get_parameter_by_name=_get_parameter_by_name),
+        u'ableton': _module(u'ableton', __path__=[]),
+        u'ableton.v2': _module(u'ableton.v2', __path__=[]),
+        u'ableton.v2.base': _module(u'ableton.v2.base', liveobj_valid=_liveobj_valid),
+        u'past': _module(u'past', __path__=[]),
+        u'past.utils': _module(u'past.utils', old_div=_old_div),
+    }
+    for root in (u'Live', u'MidiRemoteScript', u'_Framework', u'_Generic', u'ableton', u'past'):
+        if _importable(root):
+            continue
+        for name, module in modules.items():
+            if name == root or name.startswith(root + u'.'):
+                sys.modules[name] = module
+                parent, _, child = name.rpartition(u'.')
+                if parent:
+                    setattr(modules[parent], child, module)
+
+
+def live_reads():
+    """ Number of property reads and calls that went to any stand-in Live object """
+    return _live_reads[0]
+
+
+class LiveObject(object):
+    """
+    Holds properties like a Live API object, notifies 'add_<property>_listener'
+    listeners on every assignment and counts the property reads, per object in
+    'reads' and for all objects in 'live_reads'.
+    """
+
+    def __init__(self, **properties):
+        object.__setattr__(self, u'_listeners', {})
+        object.__setattr__(self, u'_properties', dict(properties))
+        object.__setattr__(self, u'reads', 0)
+
+    def __getattr__(self, name):
+        properties = object.__getattribute__(self, u'_properties')
+        if name in properties:
+            object.__setattr__(self, u'reads', self.reads + 1)
+            _live_reads[0] += 1
+            return properties[name]
+        listeners = object.__getattribute__(self, u'_listeners')
+        if name.startswith(u'add_') and name.endswith(u'_listener'):
+            return lambda *args: listeners.setdefault((name[4:-9],) + args[:-1], []).append(args[-1])
+        if name.startswith(u'remove_') and name.endswith(u'_listener'):
+            return lambda *args: listeners[(name[7:-9],) + args[:-1]].remove(args[-1])
+        if name.endswith(u'_has_listener'):
+            return lambda *args: args[-1] in listeners.get((name[:-13],) + args[:-1], [])
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self._properties[name] = value
+        self.notify(name)
+
+    def notify(self, name, *args):
+        for listener in list(self._listeners.get((name,) + args, [])):
+            listener()
+
+    def listener_count(self):
+        return sum(len(listeners) for listeners in self._listeners.values())
+
+
+def make_routing(display_name):
+    return LiveObject(display_name=display_name)
+
+
+def make_parameter(name, value = 0.5):
+    return LiveObject(name=name, original_name=name, value=value, min=0.0, max=1.0,
+        default_value=0.0, is_enabled=True, is_quantized=False)
+
+
+def make_track(name, can_be_armed = True):
+    mixer = LiveObject(panning=make_parameter(u'Pan'), volume=make_parameter(u'Volume'),
+        cue_volume=make_parameter(u'Cue'), sends=[])
+    routings = [ make_routing(u'In %d' % i) for i in range(ROUTINGS_PER_TRACK) ]
+    return LiveObject(name=name, can_be_armed=can_be_armed, arm=False, mute=False, solo=False,
+        has_audio_output=True, mixer_device=mixer, input_meter_level=0.0, output_meter_level=0.0,
+        devices=[], view=LiveObject(is_collapsed=False),
+        available_input_routing_types=routings, input_routing_type=routings[0],
+        available_input_routing_channels=routings, input_routing_channel=routings[1],
+        available_output_routing_types=routings, output_routing_type=routings[2],
+        available_output_routing_channels=routings, output_routing_channel=routings[3])
+
+
+def make_song(num_tracks = 20, num_returns = 2):
+    tracks = tuple(make_track(u'Track %d' % i) for i in range(num_tracks))
+    returns = tuple(make_track(u'Return %s' % chr(65 + i), can_be_armed=False) for i in range(num_returns))
+    view = LiveObject(selected_track=tracks[0], draw_mode=False, follow_song=False,
+        highlighted_clip_slot=None, selected_scene=None)
+    song = LiveObject(tracks=tracks, visible_tracks=tracks, return_tracks=returns,
+        master_track=make_track(u'Master', can_be_armed=False), view=view,
+        exclusive_arm=False, exclusive_solo=False, can_undo=False, can_redo=False,
+        is_playing=False, record_mode=False, loop=False, punch_in=False, punch_out=False,
+        can_jump_to_prev_cue=False, can_jump_to_next_cue=False, back_to_arranger=False,
+        signature_numerator=4, tempo=120.0, metronome=False, scenes=[], current_song_time=0.0,
+        loop_start=0.0, loop_length=4.0, last_event_time=0.0,
+        get_current_beats_song_time=lambda : u'1.1.1.1',
+        get_current_smpte_song_time=lambda time_format: u'00:00:00:00')
+    for method in (u'continue_playing', u'stop_playing', u'start_playing', u'play_selection',
+     u'set_or_delete_cue', u'undo', u'redo', u'jump_to_prev_cue', u'jump_to_next_cue',
+     u'stop_all_clips', u'jump_by'):
+        song._properties[method] = lambda *args: None
+    return song
+
+
+class ApplicationView(LiveObject):
+
+    def is_view_visible(self, view):
+        _live_reads[0] += 1
+        return view in self._properties[u'visible']
+
+    def show_view(self, view):
+        self._properties[u'visible'].append(view)
+
+    def hide_view(self, view):
+        if view in self._properties[u'visible']:
+            self._properties[u'visible'].remove(view)
+
+    def focus_view(self, view):
+        pass
+
+    def zoom_view(self, *args):
+        pass
+
+    def scroll_view(self, *args):
+        pass
+
+
+class ControlSurface(object):
+    """ What Live passes to the script as 'c_instance' """
+
+    def __init__(self, song):
+        self._song = song
+        self.sent_midi = []
+        self.rebuild_requests = 0
+
+    def song(self):
+        return self._song
+
+    def handle(self):
+        return 1
+
+    def send_midi(self, midi_bytes):
+        self.sent_midi.append(tuple(midi_bytes))
+
+    def request_rebuild_midi_map(self):
+        self.rebuild_requests += 1
+
+
+def make_script(song):
+    """ Returns a connected 'MackieControl' script for the given stand-in song """
+    import Live
+    Live.Application.current = LiveObject(view=ApplicationView(visible=[u'Arranger']))
+    from Platform_M.MackieControl import MackieControl
+    return MackieControl(ControlSurface(song))
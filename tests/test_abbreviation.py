@@ -0,0 +1,51 @@
+from Platform_M.AbbreviationEngine import AbbreviationEngine
+import corpus
+
+def legacy_generate_6_char_string(display_string):
+    """ 'MainDisplayController.__generate_6_char_string' before the AbbreviationEngine """
+    if not display_string:
+        return u'      '
+    if len(display_string.strip()) > 6 and display_string.endswith(u'dB') and display_string.find(u'.') != -1:
+        display_string = display_string[:-2]
+    if len(display_string) > 6:
+        for um in [u' ',
+         u'i',
+         u'o',
+         u'u',
+         u'e',
+         u'a']:
+            while len(display_string) > 6 and display_string.rfind(um, 1) != -1:
+                um_pos = display_string.rfind(um, 1)
+                display_string = display_string[:um_pos] + display_string[um_pos + 1:]
+
+    else:
+        display_string = display_string.center(6)
+    ret = u''
+    for i in range(6):
+        ret += display_string[i]
+
+    assert len(ret) == 6
+    return ret
+
+
+def test_abbreviate_matches_legacy_algorithm():
+    engine = AbbreviationEngine()
+    for display_string in corpus.display_strings() + [u'', None]:
+        assert engine.abbreviate(display_string) == legacy_generate_6_char_string(display_string), display_string
+
+
+def test_abbreviate_matches_legacy_algorithm_when_evicting():
+    engine = AbbreviationEngine(cache_size=16)
+    display_strings = corpus.display_strings()
+    for display_string in display_strings + display_strings[::-1]:
+        assert engine.abbreviate(display_string) == legacy_generate_6_char_string(display_string), display_string
+    assert engine.hits() > 0
+
+
+def test_abbreviate_computes_each_string_once():
+    engine = AbbreviationEngine(cache_size=len(corpus.display_strings()))
+    display_strings = corpus.display_strings()
+    for display_string in display_strings * 2:
+        engine.abbreviate(display_string)
+
+    assert engine.misses() == len(set((s for s in display_strings if s)))
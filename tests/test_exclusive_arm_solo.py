@@ -0,0 +1,69 @@
+from Platform_M.consts import *
+import standins
+
+def press(script, switch_id):
+    script.receive_midi((NOTE_ON_STATUS, switch_id, 127))
+    script.receive_midi((NOTE_ON_STATUS, switch_id, 0))
+
+
+def armed(song):
+    return [ t for t in song.tracks if t.arm ]
+
+
+def soloed(song):
+    return [ t for t in song.tracks + song.return_tracks if t.solo ]
+
+
+def test_exclusive_arm_leaves_only_the_pressed_track_armed():
+    song = standins.make_song(num_tracks=20)
+    script = standins.make_script(song)
+    song.exclusive_arm = True
+    for track in song.tracks[3:20:4]:
+        track.arm = True
+
+    press(script, SID_RECORD_ARM_BASE + 1)
+    assert armed(song) == [song.tracks[1]]
+    assert script.track_index().armed_tracks() == (song.tracks[1],)
+    press(script, SID_RECORD_ARM_BASE + 1)
+    assert armed(song) == []
+    assert script.track_index().armed_tracks() == ()
+
+
+def test_arm_with_master_inverts_exclusive_arm():
+    song = standins.make_song(num_tracks=20)
+    script = standins.make_script(song)
+    song.exclusive_arm = True
+    song.tracks[12].arm = True
+    script.receive_midi((NOTE_ON_STATUS, SID_MASTER, 127))
+    press(script, SID_RECORD_ARM_BASE + 2)
+    script.receive_midi((NOTE_ON_STATUS, SID_MASTER, 0))
+    assert armed(song) == [song.tracks[2], song.tracks[12]]
+    song.exclusive_arm = False
+    script.receive_midi((NOTE_ON_STATUS, SID_MASTER, 127))
+    press(script, SID_RECORD_ARM_BASE + 5)
+    script.receive_midi((NOTE_ON_STATUS, SID_MASTER, 0))
+    assert armed(song) == [song.tracks[5]]
+
+
+def test_exclusive_solo_also_unsolos_return_tracks():
+    song = standins.make_song(num_tracks=20, num_returns=2)
+    script = standins.make_script(song)
+    song.exclusive_solo = True
+    song.tracks[0].solo = True
+    song.tracks[19].solo = True
+    song.return_tracks[1].solo = True
+    press(script, SID_SOLO_BASE + 4)
+    assert soloed(song) == [song.tracks[4]]
+    assert script.track_index().soloed_tracks() == (song.tracks[4],)
+    assert script.track_index().any_soloed()
+    press(script, SID_SOLO_BASE + 4)
+    assert soloed(song) == []
+    assert not script.track_index().any_soloed()
+
+
+def test_non_exclusive_solo_keeps_the_other_tracks():
+    song = standins.make_song(num_tracks=20)
+    script = standins.make_script(song)
+    song.tracks[9].solo = True
+    press(script, SID_SOLO_BASE + 0)
+    assert soloed(song) == [song.tracks[0], song.tracks[9]]
@@ -0,0 +1,96 @@
+from Platform_M.consts import *
+from Platform_M.keymap import compile_keymap, emulated_modifiers
+import standins
+
+""" (switch ids, handler) of the groups 'receive_midi' forwards a switch id to """
+HANDLER_GROUPS = ((function_master_switch_ids, u'handle_master_switch_ids'),
+ (channel_strip_switch_address, u'handle_channel_strip_switch_ids'),
+ (channel_strip_assignment_switch_ids, u'handle_assignment_switch_ids'),
+ (channel_strip_control_switch_ids, u'handle_control_switch_ids'),
+ (function_key_control_switch_ids, u'handle_function_key_switch_ids'),
+ (jog_wheel_switch_ids, u'handle_jog_wheel_switch_ids'),
+ (software_controls_switch_ids, u'handle_software_controls_switch_ids'),
+ (transport_control_switch_ids, u'handle_transport_switch_ids'),
+ (marker_control_switch_ids, u'handle_marker_switch_ids'),
+ (display_switch_ids, u'handle_display_switch_ids'))
+
+def legacy_remap(note, master_is_pressed):
+    """ The remapping 'receive_midi' did inline before the keymap existed """
+    if not master_is_pressed:
+        return note
+    if 24 <= note < 32:
+        return note + 97
+    if 32 <= note < 38:
+        return note + 8
+    if note == 38:
+        return 51
+    if note == 39:
+        return 120
+    if note == 112:
+        return SID_MASTER_CUE_VOLUME
+    if note in (46, 47):
+        return note + 83
+    if note in (48, 49):
+        return note + 39
+    if note == 75:
+        return 83
+    if note == 93:
+        return SID_SHOW_ASSIGNMENT_MODE
+    return note
+
+
+def legacy_released_modifier(note, master_is_pressed):
+    """ Releasing Select 4-6 without Master released Shift, Ctrl or Alt """
+    if not master_is_pressed:
+        return {27: SID_MOD_SHIFT, 28: SID_MOD_CTRL, 29: SID_MOD_ALT}.get(note)
+
+
+def expected_handlers(note, master_is_pressed):
+    if not SID_FIRST <= note <= SID_LAST:
+        return set()
+    switch_id = legacy_remap(note, master_is_pressed)
+    result = set(((name, switch_id) for ids, name in HANDLER_GROUPS if switch_id in ids))
+    if switch_id == SID_MASTER_CUE_VOLUME:
+        result.add((u'toggle_master_cue_volume', None))
+    elif switch_id == SID_SHOW_ASSIGNMENT_MODE:
+        result.add((u'determine_assignment_mode', None))
+    modifier = legacy_released_modifier(note, master_is_pressed)
+    if modifier != None:
+        result.add((u'__release_emulated_modifier', modifier))
+    return result
+
+
+def describe(handler):
+    if hasattr(handler, u'func'):
+        return (handler.func.__name__, handler.args[0])
+    return (handler.__name__, None)
+
+
+def test_keymap_matches_legacy_remap():
+    keymap = compile_keymap()
+    assert len(keymap) == NUM_MODIFIER_STATES
+    for modifier_state in range(NUM_MODIFIER_STATES):
+        assert len(keymap[modifier_state]) == 128
+        for note in range(128):
+            assert keymap[modifier_state][note] == legacy_remap(note, modifier_state & MOD_MASTER), (modifier_state, note)
+
+
+def test_keymap_targets_fit_the_dispatchable_ids():
+    targets = set((switch_id for table in compile_keymap() for switch_id in table))
+    assert max(targets) <= SID_SHOW_ASSIGNMENT_MODE
+
+
+def test_emulated_modifiers_are_the_master_select_buttons():
+    assert emulated_modifiers() == {27: (MOD_MASTER, SID_MOD_SHIFT),
+     28: (MOD_MASTER, SID_MOD_CTRL),
+     29: (MOD_MASTER, SID_MOD_ALT)}
+
+
+def test_dispatch_table_matches_legacy_dispatching():
+    script = standins.make_script(standins.make_song())
+    table = script._MackieControl__note_dispatch_table
+    assert len(table) == NUM_MODIFIER_STATES
+    for modifier_state in range(NUM_MODIFIER_STATES):
+        for note in range(128):
+            handlers = set((describe(h) for h in table[modifier_state][note]))
+            assert handlers == expected_handlers(note, modifier_state & MOD_MASTER), (modifier_state, note)
@@ -0,0 +1,73 @@
+import pytest
+from Platform_M.consts import *
+import standins
+
+""" Live reads per display tick, measured against the tree before the LiveSnapshot (baseline) """
+LIVE_READS_PER_TICK = {None: 26,
+ SID_ASSIGNMENT_PAN: 26,
+ SID_ASSIGNMENT_SENDS: 26,
+ SID_ASSIGNMENT_PLUG_INS: 26,
+ SID_ASSIGNMENT_IO: 26}
+BASELINE_LIVE_READS_PER_TICK = {None: 39,
+ SID_ASSIGNMENT_PAN: 39,
+ SID_ASSIGNMENT_SENDS: 31,
+ SID_ASSIGNMENT_PLUG_INS: 49,
+ SID_ASSIGNMENT_IO: 71}
+WARMUP_TICKS = 20
+TICKS = 50
+
+def press(script, switch_id):
+    script.receive_midi((NOTE_ON_STATUS, switch_id, 127))
+    script.receive_midi((NOTE_ON_STATUS, switch_id, 0))
+
+
+def live_reads_per_tick(script, ticks = TICKS):
+    """ Counted at the stand-in Live objects, so reads that skip the snapshot count too """
+    result = []
+    for _ in range(ticks):
+        live_reads = standins.live_reads()
+        script.update_display()
+        result.append(standins.live_reads() - live_reads)
+
+    return result
+
+
+@pytest.mark.parametrize(u'assignment', sorted(LIVE_READS_PER_TICK, key=lambda a: a or 0))
+@pytest.mark.parametrize(u'is_playing', (False, True))
+def test_live_reads_per_tick_stay_below_the_ceiling(assignment, is_playing):
+    song = standins.make_song(num_tracks=40)
+    script = standins.make_script(song)
+    if assignment != None:
+        press(script, assignment)
+    song.is_playing = is_playing
+    live_reads_per_tick(script, WARMUP_TICKS)
+    reads = live_reads_per_tick(script)
+    assert max(reads) <= LIVE_READS_PER_TICK[assignment]
+    assert max(reads) < BASELINE_LIVE_READS_PER_TICK[assignment]
+
+
+def test_reads_within_a_frame_are_shared():
+    song = standins.make_song()
+    script = standins.make_script(song)
+    snapshot = script.live_snapshot()
+    live_reads = snapshot.live_reads()
+    with snapshot.frame():
+        for _ in range(10):
+            snapshot.selected_track()
+            snapshot.visible_tracks()
+
+    """ song, view, selected_track and visible_tracks """
+    assert snapshot.live_reads() - live_reads == 4
+    snapshot.selected_track()
+    snapshot.selected_track()
+    assert snapshot.live_reads() - live_reads == 10
+
+
+def test_notified_values_are_read_again_within_a_frame():
+    song = standins.make_song()
+    script = standins.make_script(song)
+    snapshot = script.live_snapshot()
+    with snapshot.frame():
+        assert snapshot.selected_track() is song.tracks[0]
+        song.view.selected_track = song.tracks[5]
+        assert snapshot.selected_track() is song.tracks[5]
@@ -0,0 +1,38 @@
+import pytest
+from Platform_M.consts import *
+import standins
+
+def press(script, switch_id):
+    script.receive_midi((NOTE_ON_STATUS, switch_id, 127))
+    script.receive_midi((NOTE_ON_STATUS, switch_id, 0))
+
+
+""" (switch pressed before, switch counted) """
+ASSIGNMENT_PRESSES = ((None, SID_ASSIGNMENT_IO),
+ (None, SID_ASSIGNMENT_PAN),
+ (None, SID_ASSIGNMENT_PLUG_INS),
+ (None, SID_ASSIGNMENT_SENDS),
+ (SID_ASSIGNMENT_SENDS, SID_ASSIGNMENT_PAN),
+ (None, SID_FADERBANK_NEXT_BANK),
+ (SID_FADERBANK_NEXT_BANK, SID_FADERBANK_PREV_BANK),
+ (None, SID_FADERBANK_NEXT_CH),
+ (SID_FADERBANK_NEXT_CH, SID_FADERBANK_PREV_CH))
+
+@pytest.mark.parametrize(u'before, switch_id', ASSIGNMENT_PRESSES)
+def test_assignment_press_issues_one_rebuild(before, switch_id):
+    script = standins.make_script(standins.make_song(num_tracks=40))
+    if before != None:
+        press(script, before)
+    issued = script.issued_rebuilds()
+    passed_on = script._MackieControl__c_instance.rebuild_requests
+    press(script, switch_id)
+    assert script.issued_rebuilds() == issued + 1
+    assert script._MackieControl__c_instance.rebuild_requests == passed_on + 1
+
+
+def test_assignment_presses_in_a_row():
+    script = standins.make_script(standins.make_song(num_tracks=40))
+    for _, switch_id in ASSIGNMENT_PRESSES:
+        issued = script.issued_rebuilds()
+        press(script, switch_id)
+        assert script.issued_rebuilds() == issued + 1, switch_id
@@ -0,0 +1,36 @@
+import standins
+
+def channel_strip_controller(script):
+    return script._MackieControl__channel_strip_controller
+
+
+def add_tracks_unnoticed(song, num_tracks):
+    """ Grows the track lists without notifying, as if our listeners did not run yet """
+    tracks = song.tracks + tuple(standins.make_track(u'New %d' % i) for i in range(num_tracks))
+    song._properties[u'tracks'] = tracks
+    song._properties[u'visible_tracks'] = tracks
+    return tracks
+
+
+def test_positions_are_rebuilt_on_a_miss():
+    song = standins.make_song(num_tracks=20)
+    script = standins.make_script(song)
+    track_index = script.track_index()
+    assert track_index.track_position(song.tracks[3]) == 3
+    tracks = add_tracks_unnoticed(song, 12)
+    assert track_index.track_position(tracks[25]) == 25
+    assert track_index.visible_track_position(tracks[25]) == 25
+    assert track_index.track_position(None) == None
+
+
+def test_selecting_a_track_before_the_track_lists_notified():
+    song = standins.make_song(num_tracks=20)
+    script = standins.make_script(song)
+    tracks = add_tracks_unnoticed(song, 12)
+    song.view.selected_track = tracks[25]
+    song.notify(u'tracks')
+    song.notify(u'visible_tracks')
+    song.view.selected_track = tracks[17]
+    assert channel_strip_controller(script)._ChannelStripController__bank_cha_offset == 16
+    song.view.selected_track = tracks[25]
+    assert channel_strip_controller(script)._ChannelStripController__bank_cha_offset == 24
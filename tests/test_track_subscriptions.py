@@ -0,0 +1,40 @@
+from Platform_M.consts import *
+import standins
+
+JOB = u'release unused track listeners'
+
+def press(script, switch_id):
+    script.receive_midi((NOTE_ON_STATUS, switch_id, 127))
+    script.receive_midi((NOTE_ON_STATUS, switch_id, 0))
+
+
+def release_runs(script):
+    return script.tick_scheduler().run_counts()[JOB]
+
+
+def test_release_job_is_idle_without_pending_releases():
+    script = standins.make_script(standins.make_song(num_tracks=40))
+    for _ in range(20):
+        script.update_display()
+
+    assert release_runs(script) == 0
+    press(script, SID_FADERBANK_NEXT_BANK)
+    press(script, SID_FADERBANK_NEXT_CH)
+    for _ in range(20):
+        script.update_display()
+
+    assert release_runs(script) == 0
+
+
+def test_listeners_left_by_a_mode_change_are_released_on_the_next_tick():
+    song = standins.make_song(num_tracks=40)
+    script = standins.make_script(song)
+    press(script, SID_ASSIGNMENT_IO)
+    script.update_display()
+    listeners_in_io_mode = song.tracks[0].listener_count()
+    press(script, SID_ASSIGNMENT_PAN)
+    for _ in range(20):
+        script.update_display()
+
+    assert release_runs(script) == 1
+    assert song.tracks[0].listener_count() < listeners_in_io_mode